@@ -1,8 +1,9 @@
 import os
-from fastapi import FastAPI, UploadFile, File, BackgroundTasks, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, BackgroundTasks, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from orchestrator_agent import OrchestratorAgent
+from proposal_cache import ProposalCache, config_fingerprint, is_degraded
 
 app = FastAPI()
 
@@ -19,6 +20,7 @@ UPLOAD_DIR = "uploads"
 OUTPUT_DIR = "outputs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+cache = ProposalCache(OUTPUT_DIR)
 
 @app.post("/upload")
 async def upload_rfp(file: UploadFile = File(...)):
@@ -30,23 +32,53 @@ async def upload_rfp(file: UploadFile = File(...)):
     return {"filename": file.filename}
 
 @app.post("/generate")
-async def generate_proposal(filename: str, background_tasks: BackgroundTasks):
+async def generate_proposal(filename: str, background_tasks: BackgroundTasks, job_class: str = "interactive"):
+    if job_class not in ("interactive", "batch"):
+        raise HTTPException(status_code=400, detail="job_class must be 'interactive' or 'batch'.")
     pdf_path = os.path.join(UPLOAD_DIR, filename)
     if not os.path.exists(pdf_path):
         raise HTTPException(status_code=404, detail="File not found.")
+    cache_key = cache.key(pdf_path, config_fingerprint(OrchestratorAgent.config_settings()))
+    cached = cache.get(cache_key)
+    if cached:
+        return {"message": "Proposal already generated for this RFP and configuration.", "output_file": cached, "cached": True}
+    running = cache.start(cache_key, f"proposal_{filename}")
+    if running:
+        return {"message": "Proposal generation already in progress.", "output_file": running, "cached": False}
     output_file = os.path.join(OUTPUT_DIR, f"proposal_{filename}")
     def run_orchestrator():
-        orch = OrchestratorAgent()
-        orch.run_and_export(pdf_path, output_file)
+        try:
+            orch = OrchestratorAgent()
+            proposal = orch.run_and_export(pdf_path, output_file, job_class=job_class)
+            # Fallback output from a failed LLM call is served once but regenerated next time
+            if not is_degraded(proposal):
+                cache.put(cache_key, f"proposal_{filename}")
+        finally:
+            cache.finish(cache_key)
     background_tasks.add_task(run_orchestrator)
-    return {"message": "Proposal generation started.", "output_file": f"proposal_{filename}"}
+    return {"message": "Proposal generation started.", "output_file": f"proposal_{filename}", "cached": False}
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
 
 @app.get("/download/{output_file}")
-async def download_proposal(output_file: str):
+async def download_proposal(output_file: str, request: Request):
     file_path = os.path.join(OUTPUT_DIR, output_file)
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Proposal not ready yet.")
-    return FileResponse(file_path, media_type="application/pdf", filename=output_file)
+    stat = os.stat(file_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse answers Range / If-Range requests (206, multipart ranges, 416) against our ETag
+    return FileResponse(file_path, media_type="application/pdf", filename=output_file, headers=headers, stat_result=stat)
 
 @app.get("/health")
 def health():
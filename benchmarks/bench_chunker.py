@@ -0,0 +1,95 @@
+"""Compares the layout-aware chunker with the previous RecursiveCharacterTextSplitter(1000, 200).
+
+Usage: python benchmarks/bench_chunker.py [pdf ...] [--k 5] [--no-embed]
+Reports chunk count, characters embedded, embedding time and the evidence tokens a
+TechnicalAgent-style prompt receives for a set of RFP queries (top-k retrieval). With
+--no-embed (or when the embedding model is unavailable) retrieval falls back to BM25.
+"""
+import argparse
+import glob
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: E402
+from chunker import chunk_pages  # noqa: E402
+from document_processor import extract_pages_from_pdf  # noqa: E402
+from hybrid_retriever import BM25Index  # noqa: E402
+
+QUERIES = [
+    "Extract RFP structure",
+    "scope of work and services to be provided",
+    "locations and sites covered",
+    "hardware inventory servers PCs firewalls",
+    "pricing, payment schedule and hourly rates",
+    "submission deadline and proposal requirements",
+    "term of agreement and termination",
+]
+
+
+def approx_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a)) or 1.0
+    nb = math.sqrt(sum(y * y for y in b)) or 1.0
+    return dot / (na * nb)
+
+
+def evaluate(name: str, chunks, embeddings, k: int) -> dict:
+    result = {"name": name, "chunks": len(chunks), "chars": sum(len(c) for c in chunks), "embed_s": None}
+    if embeddings is not None:
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(chunks)
+        result["embed_s"] = time.perf_counter() - start
+        query_vectors = embeddings.embed_documents(QUERIES)
+        ranked = [
+            sorted(range(len(chunks)), key=lambda i: _cosine(qv, vectors[i]), reverse=True)[:k]
+            for qv in query_vectors
+        ]
+    else:
+        index = BM25Index()
+        index.add_texts(chunks)
+        ranked = [[doc_id for doc_id, _ in index.search(q, k=k)] for q in QUERIES]
+    evidence_tokens = [approx_tokens("\n\n".join(chunks[i] for i in ids)) for ids in ranked]
+    result["prompt_tokens"] = sum(evidence_tokens) / len(evidence_tokens)
+    return result
+
+
+def main() -> int:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob(os.path.join(root, "uploads", "*.pdf"))))
+    parser.add_argument("--k", type=int, default=5, help="chunks retrieved per query (TechnicalAgent uses 5)")
+    parser.add_argument("--no-embed", action="store_true", help="skip the embedding model; retrieve with BM25")
+    args = parser.parse_args()
+
+    embeddings = None
+    if not args.no_embed:
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        except Exception as e:
+            print(f"Embedding model unavailable ({type(e).__name__}); using BM25 retrieval and skipping embed timing.")
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    for pdf in args.pdfs:
+        pages = extract_pages_from_pdf(pdf)
+        baseline = splitter.split_text("\n\n".join(pages))
+        layout = [chunk for chunk, _ in chunk_pages(pages)]
+        print(f"\n{os.path.basename(pdf)} ({len(pages)} pages)")
+        print(f"{'splitter':<22}{'chunks':>8}{'chars':>10}{'embed s':>10}{'prompt tok':>12}")
+        for res in (evaluate("recursive 1000/200", baseline, embeddings, args.k),
+                    evaluate("layout-aware", layout, embeddings, args.k)):
+            embed = f"{res['embed_s']:.3f}" if res["embed_s"] is not None else "-"
+            print(f"{res['name']:<22}{res['chunks']:>8}{res['chars']:>10}{embed:>10}{res['prompt_tokens']:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Renders a proposal with a very large pricing table and reports time and peak memory.
+
+Usage: python benchmarks/bench_pdf_table.py [--rows 10000] [--max-seconds 8] [--max-mb 160]
+Exits non-zero if either bound is exceeded.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_exporter import create_proposal_pdf  # noqa: E402
+
+
+def build_proposal(rows: int) -> dict:
+    line_items = []
+    for i in range(rows):
+        notes = "Heuristic estimate; replace with historical ML model if available."
+        if i % 10 == 0:
+            # every tenth row carries a long, unique note that wraps over several lines
+            notes = f"Site {i}: " + "onsite hardware refresh, imaging and user migration " * 4
+        line_items.append({"requirement_id": f"REQ-{i + 1}", "hours": 32, "cost": 3840.0, "notes": notes})
+    return {
+        "client": "Benchmark Client",
+        "sections": [{"title": "V. Timeline and Pricing", "content": "Pricing summary."}],
+        "pricing": {
+            "line_items": line_items,
+            "scenarios": {"baseline": 3840.0 * rows, "competitive": 3532.8 * rows, "premium": 4800.0 * rows},
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--max-seconds", type=float, default=8.0)
+    parser.add_argument("--max-mb", type=float, default=160.0)
+    args = parser.parse_args()
+
+    proposal = build_proposal(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "bench_proposal.pdf")
+        start = time.perf_counter()
+        create_proposal_pdf(proposal, out)
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(out) / 1e6
+
+    # ru_maxrss is reported in KiB on Linux; peak RSS avoids tracemalloc's large slowdown
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"rows={args.rows} time={elapsed:.2f}s rows/s={args.rows / elapsed:,.0f} "
+          f"peak_mem={peak_mb:.1f}MB pdf_size={size_mb:.1f}MB")
+    if elapsed > args.max_seconds or peak_mb > args.max_mb:
+        print(f"FAILED: bounds are {args.max_seconds}s and {args.max_mb}MB")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+_NUMBERED_HEADING = re.compile(r"^(?:\d+(?:\.\d+)*|[IVXLC]+|[A-Z])[.)]\s+[A-Z]")
+_KEYWORD_HEADING = re.compile(r"^(?:section|article|part|exhibit|attachment|appendix|schedule)\s+[\w.-]+", re.I)
+_PAGE_PLACEHOLDER = re.compile(r"^\[Page \d+: (?:extracted no text|extraction error)\]$")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+_BULLETS = "•▪◦‣-–*"
+
+
+def is_heading(line: str) -> bool:
+    """Heuristic heading detection for extracted RFP text: numbered or keyword headings, short
+    ALL-CAPS lines, short lines ending in a colon, and short Title Case lines."""
+    line = line.strip()
+    if not line or len(line) > 80 or line[0] in _BULLETS:
+        return False
+    if _NUMBERED_HEADING.match(line) or _KEYWORD_HEADING.match(line):
+        return True
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 3 and all(c.isupper() for c in letters) and len(line) <= 60:
+        return True
+    if line.endswith(":") and len(line) <= 60 and line[0].isupper():
+        return True
+    words = line.split()
+    if len(words) <= 6 and len(line) <= 50 and line[-1] not in ".,;!?":
+        significant = [w for w in words if len(w) > 3 and w[0].isalpha()]
+        return bool(significant) and all(w[0].isupper() for w in significant)
+    return False
+
+
+def _boilerplate_lines(pages: List[List[str]]) -> set:
+    """Lines (ignoring digits) repeated on at least half of the pages, e.g. running headers and footers."""
+    if len(pages) < 3:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update({re.sub(r"\d+", "#", line) for line in lines})
+    return {line for line, n in counts.items() if n >= max(3, len(pages) / 2)}
+
+
+def _split_long(line: str, max_chars: int) -> List[str]:
+    """Splits an over-long line at sentence ends, then at whitespace, then hard."""
+    pieces, current = [], ""
+    for part in _SENTENCE_END.split(line):
+        while len(part) > max_chars:
+            cut = part.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(part[:cut])
+            part = part[cut:].lstrip()
+        if current and len(current) + 1 + len(part) > max_chars:
+            pieces.append(current)
+            current = part
+        else:
+            current = f"{current} {part}" if current else part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_pages(pages: List[str], max_chars: int = 1000, min_chars: int = 200) -> List[Tuple[str, Dict]]:
+    """Splits per-page text into non-overlapping chunks aligned to detected sections.
+
+    A chunk is cut at a heading once it holds at least `min_chars` (smaller sections are merged
+    with the next one), and at a line boundary before it would exceed `max_chars`. Running
+    headers/footers and empty-page placeholders are dropped. Returns (text, metadata) pairs with
+    `page_start`, `page_end` (1-based) and `section` (the heading in force when the chunk starts)."""
+    page_lines = [
+        [line.strip() for line in (page or "").splitlines() if line.strip() and not _PAGE_PLACEHOLDER.match(line.strip())]
+        for page in pages
+    ]
+    boilerplate = _boilerplate_lines(page_lines)
+
+    chunks: List[Tuple[str, Dict]] = []
+    buffer: List[str] = []
+    size = 0
+    has_body = False
+    section = ""
+    meta = {"page_start": 1, "page_end": 1, "section": ""}
+
+    def flush():
+        nonlocal buffer, size, has_body
+        if buffer:
+            chunks.append(("\n".join(buffer), dict(meta)))
+        buffer, size, has_body = [], 0, False
+
+    for page_no, lines in enumerate(page_lines, start=1):
+        for line in lines:
+            if re.sub(r"\d+", "#", line) in boilerplate:
+                continue
+            heading = is_heading(line)
+            if heading:
+                if size >= min_chars:
+                    flush()
+                section = line.rstrip(":").strip()
+                # A chunk holding only headings so far (title, then section) takes the innermost one
+                if buffer and not has_body:
+                    meta["section"] = section
+            for piece in _split_long(line, max_chars) if len(line) > max_chars else [line]:
+                if buffer and size + 1 + len(piece) > max_chars:
+                    flush()
+                if not buffer:
+                    meta = {"page_start": page_no, "page_end": page_no, "section": section}
+                buffer.append(piece)
+                size += len(piece) + (1 if size else 0)
+                has_body = has_body or not heading
+                meta["page_end"] = page_no
+    flush()
+    return chunks
+
+
+def chunk_text(text: str, max_chars: int = 1000, min_chars: int = 200) -> List[str]:
+    """Chunk texts for a document without page structure (treated as a single page)."""
+    return [chunk for chunk, _ in chunk_pages([text], max_chars=max_chars, min_chars=min_chars)]
@@ -1,9 +1,10 @@
 import os
+from typing import List
 from pypdf import PdfReader
 
 
-def extract_text_from_pdf(path: str) -> str:
-    """Extracts text from PDF. If text extraction yields very little text, attempts OCR if dependencies are available."""
+def extract_pages_from_pdf(path: str) -> List[str]:
+    """Extracts text per page. If text extraction yields very little text, attempts OCR if dependencies are available."""
     text_parts = []
     reader = PdfReader(path)
     for page_num, page in enumerate(reader.pages, start=1):
@@ -29,9 +30,14 @@ def extract_text_from_pdf(path: str) -> str:
             ocr_text = []
             for i, img in enumerate(images):
                 ocr_text.append(pytesseract.image_to_string(img))
-            combined = "\n\n".join(ocr_text)
+            text_parts = ocr_text
         except Exception:
             # OCR not available or failed; continue with what we have
             pass
 
-    return combined
+    return text_parts
+
+
+def extract_text_from_pdf(path: str) -> str:
+    """Extracts text from PDF as a single string, pages separated by blank lines."""
+    return "\n\n".join(extract_pages_from_pdf(path))
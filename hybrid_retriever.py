@@ -0,0 +1,242 @@
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+
+BM25_INDEX_FILE = "bm25_index.jsonl"
+
+# Keeps model numbers and dotted/hyphenated tokens ("R740", "TZ-400", "10.2") intact
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[.\-/][A-Za-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(text or "")]
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over text chunks.
+    Postings map each term to {doc_id: term_frequency}; the index is persisted next to the Chroma store
+    as one JSON-encoded chunk per line."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: List[str] = []
+        self.doc_lens: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add_texts(self, texts: List[str]) -> None:
+        for text in texts:
+            doc_id = len(self.docs)
+            tokens = tokenize(text)
+            self.docs.append(text)
+            self.doc_lens.append(len(tokens))
+            self._total_len += len(tokens)
+            for tok in tokens:
+                bucket = self.postings.setdefault(tok, {})
+                bucket[doc_id] = bucket.get(doc_id, 0) + 1
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Returns up to k (doc_id, score) pairs, best first. Only documents sharing a term with the query are scored."""
+        if not self.docs:
+            return []
+        avg_len = self._total_len / len(self.docs) or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lens[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+    def contains_all(self, doc_id: int, terms: List[str]) -> bool:
+        return all(doc_id in self.postings.get(t, ()) for t in terms)
+
+    def extended(self, texts: List[str]) -> "BM25Index":
+        """Returns a new index with `texts` appended, leaving this one untouched.
+        Only the new texts are tokenized; postings buckets are copied only where a new text adds to them."""
+        index = BM25Index(k1=self.k1, b=self.b)
+        index.docs = list(self.docs)
+        index.doc_lens = list(self.doc_lens)
+        index.postings = dict(self.postings)
+        index._total_len = self._total_len
+        copied = set()
+        for text in texts:
+            doc_id = len(index.docs)
+            tokens = tokenize(text)
+            index.docs.append(text)
+            index.doc_lens.append(len(tokens))
+            index._total_len += len(tokens)
+            for tok in tokens:
+                if tok not in copied:
+                    index.postings[tok] = dict(index.postings.get(tok, {}))
+                    copied.add(tok)
+                bucket = index.postings[tok]
+                bucket[doc_id] = bucket.get(doc_id, 0) + 1
+        return index
+
+    def save(self, path: str) -> None:
+        """Writes a full snapshot in the append-only format used by `update_bm25_index`."""
+        # Unique temp file in the target directory so concurrent writers never share it
+        fd, tmp_path = tempfile.mkstemp(prefix=BM25_INDEX_FILE + ".", suffix=".tmp", dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(doc) + "\n" for doc in self.docs)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        index = cls()
+        index.add_texts(_read_docs(path, 0)[0])
+        return index
+
+
+def _read_docs(path: str, offset: int) -> Tuple[List[str], int]:
+    """Reads the JSON-lines docs stored after byte `offset`. Returns them with the offset just past
+    the last complete line, so a line still being appended is picked up on the next read."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data.rfind(b"\n") + 1
+    docs = []
+    for line in data[:complete].splitlines():
+        try:
+            docs.append(json.loads(line))
+        except ValueError:
+            # Torn line left by an interrupted write
+            continue
+    return docs, offset + complete
+
+
+# path -> (inode, bytes consumed, index)
+_loaded_indexes: Dict[str, Tuple[int, int, BM25Index]] = {}
+# Serialises appends to and reloads of the on-disk indexes across concurrent proposal jobs
+_index_lock = threading.RLock()
+
+
+def load_bm25_index(persist_directory: str) -> Optional[BM25Index]:
+    """Loads the BM25 index stored in a Chroma directory. The in-memory copy is reused while the file
+    is unchanged and extended with only the docs appended since it was read.
+    The returned index is never modified afterwards, so callers may search it without locking."""
+    path = os.path.join(persist_directory, BM25_INDEX_FILE)
+    with _index_lock:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        cached = _loaded_indexes.get(path)
+        if cached and cached[0] == stat.st_ino and cached[1] <= stat.st_size:
+            _, offset, base = cached
+            if offset == stat.st_size:
+                return base
+        else:
+            # First load, or the file was replaced or truncated
+            offset, base = 0, BM25Index()
+        texts, offset = _read_docs(path, offset)
+        index = base.extended(texts) if texts else base
+        _loaded_indexes[path] = (stat.st_ino, offset, index)
+        return index
+
+
+def update_bm25_index(persist_directory: str, texts: List[str]) -> BM25Index:
+    """Adds chunks to the directory's BM25 index, mirroring what Chroma.from_texts appends to the vector store.
+    The chunks are appended to the index file and a new index object is swapped in, leaving indexes
+    already handed to readers untouched."""
+    path = os.path.join(persist_directory, BM25_INDEX_FILE)
+    payload = "".join(json.dumps(text) + "\n" for text in texts).encode("utf-8")
+    with _index_lock:
+        # A single O_APPEND write keeps the batch contiguous even with writers in other processes
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        return load_bm25_index(persist_directory)
+
+
+class HybridRetriever:
+    """Fuses BM25 and dense similarity scores over the same chunks.
+
+    Scores from each side are min-max normalised and combined as
+    alpha * dense + (1 - alpha) * lexical. Short queries whose best lexical hit
+    contains every query term are answered from the inverted index alone, so no
+    embedding call is made for exact lookups such as "SonicWALL" or "PowerEdge R740"."""
+
+    def __init__(self, vectorstore=None, bm25: Optional[BM25Index] = None, k: int = 5,
+                 alpha: float = 0.5, fetch_k: int = 20, lexical_max_terms: int = 6):
+        self.vectorstore = vectorstore
+        self.bm25 = bm25
+        self.k = k
+        self.alpha = alpha
+        self.fetch_k = fetch_k
+        self.lexical_max_terms = lexical_max_terms
+
+    @staticmethod
+    def _normalise(scores: Dict[str, float]) -> Dict[str, float]:
+        if not scores:
+            return {}
+        lo, hi = min(scores.values()), max(scores.values())
+        if hi == lo:
+            return {key: 1.0 for key in scores}
+        return {key: (s - lo) / (hi - lo) for key, s in scores.items()}
+
+    def _lexical(self, query: str) -> List[Tuple[int, float]]:
+        if self.bm25 is None or not len(self.bm25):
+            return []
+        return self.bm25.search(query, k=self.fetch_k)
+
+    def _is_exact_lookup(self, query: str, lexical_hits: List[Tuple[int, float]]) -> bool:
+        terms = list(set(tokenize(query)))
+        if not terms or len(terms) > self.lexical_max_terms or not lexical_hits:
+            return False
+        return self.bm25.contains_all(lexical_hits[0][0], terms)
+
+    def invoke(self, query: str) -> List[Document]:
+        lexical_hits = self._lexical(query)
+        if self.vectorstore is None or self._is_exact_lookup(query, lexical_hits):
+            return [
+                Document(page_content=self.bm25.docs[doc_id], metadata={"bm25_score": score})
+                for doc_id, score in lexical_hits[:self.k]
+            ]
+
+        dense_hits = self.vectorstore.similarity_search_with_relevance_scores(query, k=self.fetch_k)
+        # Chroma ids are not shared with the BM25 index, so chunks are joined on their text
+        docs: Dict[str, Document] = {}
+        dense_scores: Dict[str, float] = {}
+        for doc, score in dense_hits:
+            docs.setdefault(doc.page_content, doc)
+            dense_scores[doc.page_content] = max(score, dense_scores.get(doc.page_content, score))
+        lexical_scores: Dict[str, float] = {}
+        for doc_id, score in lexical_hits:
+            text = self.bm25.docs[doc_id]
+            docs.setdefault(text, Document(page_content=text))
+            lexical_scores[text] = max(score, lexical_scores.get(text, score))
+
+        dense_norm = self._normalise(dense_scores)
+        lexical_norm = self._normalise(lexical_scores)
+        fused = {
+            text: self.alpha * dense_norm.get(text, 0.0) + (1 - self.alpha) * lexical_norm.get(text, 0.0)
+            for text in docs
+        }
+        ranked = sorted(fused, key=fused.get, reverse=True)[:self.k]
+        return [docs[text] for text in ranked]
@@ -0,0 +1,219 @@
+"""Bulk, incremental ingestion of past RFPs and proposals into the knowledge-base collection.
+
+Usage: python ingest_knowledge_base.py <directory> [--chroma-dir chroma_db] [--workers N] [--batch-size 256]
+
+Several directories can share one --chroma-dir: the manifest is keyed by absolute path and a
+run only removes chunks of files that disappeared from the directory it scans.
+Files are re-processed only when their size/mtime changed and their SHA-256 differs from the
+last run; chunks of deleted or changed files are removed. Files that cannot be read are
+reported and skipped, and retried on the next run. TechnicalAgent queries the
+resulting collection for evidence from historical bids.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+from chunker import chunk_pages
+from document_processor import extract_pages_from_pdf
+
+KNOWLEDGE_BASE_COLLECTION = "past_proposals"
+MANIFEST_FILE = "kb_manifest.json"
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _extract_file(path: str, known_hash: Optional[str]) -> Tuple[str, str, Optional[List[str]]]:
+    """Worker: hashes the file and extracts its per-page text (a text file is one page), unless the
+    content is unchanged (pages is then None)."""
+    sha = _sha256(path)
+    if sha == known_hash:
+        return path, sha, None
+    if path.lower().endswith(".pdf"):
+        return path, sha, extract_pages_from_pdf(path)
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return path, sha, [f.read()]
+
+
+def _is_under(path: str, root: str) -> bool:
+    try:
+        return os.path.commonpath([path, root]) == root
+    except ValueError:
+        # Relative key or a different drive
+        return False
+
+
+def _default_vectordb(persist_directory: str):
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from langchain_community.vectorstores import Chroma
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    return Chroma(collection_name=KNOWLEDGE_BASE_COLLECTION, persist_directory=persist_directory,
+                  embedding_function=embeddings)
+
+
+class KnowledgeBaseIngestor:
+    """Indexes a directory tree into the knowledge-base collection.
+
+    Text extraction runs in a process pool and keeps page boundaries, so `split_pages`
+    (chunk_pages by default) can drop running headers/footers and record `page_start`,
+    `page_end` and `section` with each chunk. Chunks from many files are embedded together in
+    batches of `batch_size` through `vectordb.add_texts`. The manifest (path -> hash, mtime,
+    size, chunk ids) is saved after every flushed batch, so an interrupted run resumes where it
+    stopped. Manifest entries are keyed by absolute path. Chunk ids derive from the file path
+    and content hash, so re-adds are idempotent and identical files at different paths keep
+    separate chunks."""
+
+    def __init__(self, persist_directory: str = "chroma_db", vectordb=None, split_pages=None,
+                 workers: Optional[int] = None, batch_size: int = 256):
+        self.persist_directory = persist_directory
+        os.makedirs(persist_directory, exist_ok=True)
+        self.vectordb = vectordb if vectordb is not None else _default_vectordb(persist_directory)
+        self.split_pages = split_pages or chunk_pages
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.manifest_path = os.path.join(persist_directory, MANIFEST_FILE)
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+        self._pending_texts: List[str] = []
+        self._pending_ids: List[str] = []
+        self._pending_meta: List[Dict] = []
+        self._pending_entries: Dict[str, Dict] = {}
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self) -> None:
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _discover(directory: str) -> List[str]:
+        found = []
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    found.append(os.path.join(root, name))
+        return sorted(found)
+
+    def _flush(self) -> None:
+        if self._pending_texts:
+            self.vectordb.add_texts(self._pending_texts, metadatas=self._pending_meta, ids=self._pending_ids)
+        self.manifest.update(self._pending_entries)
+        self._save_manifest()
+        self._pending_texts, self._pending_ids, self._pending_meta = [], [], []
+        self._pending_entries = {}
+
+    def _queue_chunks(self, path: str, source: str, sha: str, pages: List[str], stat: os.stat_result) -> int:
+        old = self.manifest.get(path)
+        if old and old.get("ids"):
+            self.vectordb.delete(ids=old["ids"])
+        chunks = [(text, meta) for text, meta in self.split_pages(pages) if text.strip()]
+        path_key = hashlib.sha256(path.encode("utf-8")).hexdigest()[:8]
+        ids = [f"{path_key}-{sha[:16]}-{i}" for i in range(len(chunks))]
+        self._pending_texts.extend(text for text, _ in chunks)
+        self._pending_ids.extend(ids)
+        self._pending_meta.extend({**meta, "source": source, "chunk": i} for i, (_, meta) in enumerate(chunks))
+        self._pending_entries[path] = {"sha256": sha, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "ids": ids}
+        if len(self._pending_texts) >= self.batch_size:
+            self._flush()
+        return len(chunks)
+
+    def ingest(self, directory: str) -> Dict:
+        """Indexes new and changed files under `directory` and returns throughput statistics."""
+        start = time.perf_counter()
+        stats = {"files_seen": 0, "files_indexed": 0, "files_unchanged": 0, "files_removed": 0,
+                 "files_failed": 0, "chunks_added": 0, "bytes_extracted": 0}
+        root = os.path.abspath(directory)
+        paths = self._discover(root)
+        stats["files_seen"] = len(paths)
+        seen = set(paths)
+        to_check = []
+        for path in paths:
+            entry = self.manifest.get(path)
+            stat = os.stat(path)
+            # Fast path: same size and mtime means the file has not been touched
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                stats["files_unchanged"] += 1
+                continue
+            to_check.append((path, entry["sha256"] if entry else None))
+
+        if to_check:
+            sources = {path: os.path.relpath(path, root) for path, _ in to_check}
+            if self.workers > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    futures = {pool.submit(_extract_file, path, known): path for path, known in to_check}
+                    self._consume(((futures[fut], fut.result) for fut in as_completed(futures)), sources, stats)
+            else:
+                self._consume(((path, partial(_extract_file, path, known)) for path, known in to_check),
+                              sources, stats)
+
+        # Only files under the scanned root can have disappeared; other roots' entries are kept
+        removed = [p for p in self.manifest if p not in seen and _is_under(p, root)]
+        for path in removed:
+            if self.manifest[path].get("ids"):
+                self.vectordb.delete(ids=self.manifest[path]["ids"])
+            del self.manifest[path]
+            stats["files_removed"] += 1
+        self._flush()
+
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 3)
+        stats["files_per_second"] = round(stats["files_indexed"] / elapsed, 2) if elapsed else 0.0
+        stats["chunks_per_second"] = round(stats["chunks_added"] / elapsed, 2) if elapsed else 0.0
+        stats["mb_per_second"] = round(stats["bytes_extracted"] / 1e6 / elapsed, 3) if elapsed else 0.0
+        return stats
+
+    def _consume(self, results, sources: Dict[str, str], stats: Dict) -> None:
+        """`results` yields (path, fetch) pairs; fetch() returns the worker's (path, sha, pages).
+        `sources` maps each path to the root-relative name stored in chunk metadata."""
+        for path, fetch in results:
+            try:
+                _, sha, pages = fetch()
+            except Exception as e:
+                # One unreadable file must not abort the run; it stays out of the manifest and is retried next time
+                print(f"Skipping {sources[path]}: {type(e).__name__}: {e}")
+                stats["files_failed"] += 1
+                continue
+            stat = os.stat(path)
+            if pages is None:
+                # Touched but identical content: only refresh the fast-path fields
+                self.manifest[path].update({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+                stats["files_unchanged"] += 1
+                continue
+            stats["chunks_added"] += self._queue_chunks(path, sources[path], sha, pages, stat)
+            stats["files_indexed"] += 1
+            stats["bytes_extracted"] += sum(len(page.encode("utf-8")) for page in pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a directory of past RFPs and proposals for RAG.")
+    parser.add_argument("directory")
+    parser.add_argument("--chroma-dir", default="chroma_db")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=256, help="chunks per embedding batch")
+    args = parser.parse_args()
+
+    ingestor = KnowledgeBaseIngestor(args.chroma_dir, workers=args.workers, batch_size=args.batch_size)
+    stats = ingestor.ingest(args.directory)
+    print(f"Scanned {stats['files_seen']} files: {stats['files_indexed']} indexed, "
+          f"{stats['files_unchanged']} unchanged, {stats['files_removed']} removed, {stats['files_failed']} failed.")
+    print(f"Added {stats['chunks_added']} chunks in {stats['seconds']}s "
+          f"({stats['files_per_second']} files/s, {stats['chunks_per_second']} chunks/s, {stats['mb_per_second']} MB/s of text).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from langchain_groq import ChatGroq
+from llm_governor import LLMGovernor, estimate_tokens, get_governor
+
+load_dotenv()
+
+DEFAULT_FALLBACK_MODEL = "llama-3.1-8b-instant"
+
+# Attempts run on worker threads so a call can be abandoned at its deadline or hedged
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm")
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when the primary and fallback models all fail or time out for a call."""
+
+
+class LLMResponse(str):
+    """Response text that also carries which model answered and how long the call queued
+    in the governor before being sent."""
+
+    def __new__(cls, text: str, model: str = "", queue_wait: float = 0.0):
+        obj = super().__new__(cls, text)
+        obj.model = model
+        obj.queue_wait = queue_wait
+        return obj
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and rejects calls until
+    `reset_timeout` seconds pass; then lets a single trial call through (half-open)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies used to pick the hedging delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientLLM:
+    """Callable LLM client shared by the agents: `client(prompt)` returns an LLMResponse (a str).
+
+    Each model is tried with a per-attempt deadline and up to `max_retries` retries with
+    full-jitter exponential backoff. Once enough latencies are recorded, an attempt still
+    running past the `hedge_percentile` latency gets a duplicate request and the first answer
+    wins. Every model has its own circuit breaker; when the primary is failing or its breaker
+    is open the call falls through to the next model in `models`. With a `governor`, every
+    request (retries included) is admitted through its rate and token budgets; hedges are
+    only sent when budget is free right away. `call_deadline` bounds the whole call, governor
+    queueing, retries, backoff and fallbacks included: each step is capped by what is left of
+    it, and LLMUnavailableError is raised once it is spent."""
+
+    def __init__(self, models: List[Tuple[str, object]], timeout: float = 60.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, hedge_percentile: float = 0.95,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0,
+                 governor: Optional[LLMGovernor] = None, call_deadline: Optional[float] = None):
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models = models
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.governor = governor
+        self.call_deadline = call_deadline
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(breaker_threshold, breaker_reset) for name, _ in models
+        }
+        self.latency: Dict[str, LatencyTracker] = {name: LatencyTracker() for name, _ in models}
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "fallbacks": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _text(resp) -> str:
+        content = getattr(resp, "content", None)
+        return content if isinstance(content, str) else str(resp)
+
+    @staticmethod
+    def _used_tokens(resp) -> Optional[int]:
+        usage = getattr(resp, "usage_metadata", None) or {}
+        return usage.get("total_tokens")
+
+    def _timed_invoke(self, model, prompt: str):
+        start = time.monotonic()
+        resp = model.invoke(prompt)
+        return resp, time.monotonic() - start
+
+    def _attempt(self, name: str, model, prompt: str, tokens: int, timeout: float):
+        """One attempt within `timeout` seconds, hedged with a duplicate request if it runs slow."""
+        deadline = time.monotonic() + timeout
+        pending = {_executor.submit(self._timed_invoke, model, prompt)}
+        hedge_after = self.latency[name].percentile(self.hedge_percentile)
+        hedged = hedge_after is None
+        last_error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining if hedged else min(remaining, hedge_after)
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    resp, elapsed = fut.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                self.latency[name].record(elapsed)
+                return resp
+            if not done and not hedged:
+                hedged = True
+                if self.governor is None or self.governor.try_acquire(name, tokens):
+                    self._count("hedges")
+                    pending.add(_executor.submit(self._timed_invoke, model, prompt))
+        if last_error is not None and not pending:
+            raise last_error
+        raise TimeoutError(f"{name} did not answer within {timeout:.1f}s")
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def __call__(self, prompt: str, task: str = "mapping") -> LLMResponse:
+        """`task` (extraction, mapping or polishing) sets the call's priority in the governor."""
+        self._count("calls")
+        tokens = estimate_tokens(prompt)
+        queue_wait = 0.0
+        errors = []
+        call_end = time.monotonic() + self.call_deadline if self.call_deadline is not None else None
+
+        def remaining() -> float:
+            return call_end - time.monotonic() if call_end is not None else float("inf")
+
+        for idx, (name, model) in enumerate(self.models):
+            if remaining() <= 0:
+                break
+            if idx > 0:
+                self._count("fallbacks")
+            breaker = self.breakers[name]
+            for attempt in range(self.max_retries + 1):
+                if remaining() <= 0:
+                    break
+                if not breaker.allow():
+                    errors.append(f"{name}: circuit open")
+                    break
+                grant = None
+                if self.governor is not None:
+                    try:
+                        grant = self.governor.acquire(name, tokens, task=task,
+                                                      timeout=None if call_end is None else remaining())
+                    except TimeoutError as e:
+                        errors.append(f"{name}: {e}")
+                        break
+                    queue_wait += grant.wait_seconds
+                try:
+                    resp = self._attempt(name, model, prompt, tokens, min(self.timeout, remaining()))
+                except Exception as e:
+                    breaker.record_failure()
+                    errors.append(f"{name}: {type(e).__name__}: {e}")
+                    if attempt < self.max_retries:
+                        self._count("retries")
+                        time.sleep(max(0.0, min(self._backoff(attempt), remaining())))
+                    continue
+                breaker.record_success()
+                used = self._used_tokens(resp)
+                if grant is not None and used:
+                    self.governor.settle(grant, used)
+                return LLMResponse(self._text(resp), model=name, queue_wait=queue_wait)
+        self._count("failures")
+        if call_end is not None and remaining() <= 0:
+            errors.append(f"call deadline of {self.call_deadline}s exceeded")
+        raise LLMUnavailableError("; ".join(errors[-4:]))
+
+
+_clients: Dict[Tuple[str, str], ResilientLLM] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(model_name: str, fallback_model: Optional[str] = None) -> ResilientLLM:
+    """Returns the process-wide client for a model so agents share breaker and latency state.
+    Per-attempt deadline, retries, fallback and the overall per-call budget come from LLM_TIMEOUT,
+    LLM_MAX_RETRIES, LLM_FALLBACK_MODEL and LLM_CALL_DEADLINE."""
+    fallback = fallback_model or os.getenv("LLM_FALLBACK_MODEL", DEFAULT_FALLBACK_MODEL)
+    key = (model_name, fallback)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+            names = [model_name] + ([fallback] if fallback and fallback != model_name else [])
+            # Retries are handled here, so the Groq SDK's own retry loop is disabled
+            models = [(name, ChatGroq(temperature=0, model=name, timeout=timeout, max_retries=0)) for name in names]
+            client = _clients[key] = ResilientLLM(
+                models, timeout=timeout, max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+                governor=get_governor(), call_deadline=float(os.getenv("LLM_CALL_DEADLINE", "120")),
+            )
+        return client
@@ -0,0 +1,197 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Lower rank is served first
+JOB_CLASSES = {"interactive": 0, "batch": 1}
+TASK_PRIORITIES = {"extraction": 0, "mapping": 1, "polishing": 2}
+
+_current_job: contextvars.ContextVar = contextvars.ContextVar("llm_job", default=("default", "interactive"))
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to `capacity` tokens, refilled at `rate` tokens per second.
+    The level may go negative when a call turns out larger than estimated (see LLMGovernor.settle)."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+class Grant:
+    """Admission ticket for one LLM request; `wait_seconds` is the time spent queued."""
+
+    def __init__(self, model: str, tokens: int, job_id: str, wait_seconds: float):
+        self.model = model
+        self.tokens = tokens
+        self.job_id = job_id
+        self.wait_seconds = wait_seconds
+
+
+class LLMGovernor:
+    """Process-wide admission control for LLM requests.
+
+    Each model has a requests-per-minute and a tokens-per-minute bucket. Waiting calls are
+    ordered by job class (interactive before batch), then task priority (extraction, mapping,
+    polishing), then by how many tokens their job has already been granted, so concurrent
+    jobs of the same class share the budget fairly. Only the head of a model's queue may
+    take from its buckets."""
+
+    def __init__(self, default_rpm: int = 30, default_tpm: int = 6000,
+                 limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.limits = limits or {}
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        self._waiting: Dict[str, list] = {}
+        self._served: Dict[str, int] = {}
+        self._job_stats: Dict[str, Dict[str, float]] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _model_buckets(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            rpm, tpm = self.limits.get(model, (self.default_rpm, self.default_tpm))
+            buckets = self._buckets[model] = (TokenBucket(rpm, rpm / 60.0), TokenBucket(tpm, tpm / 60.0))
+        return buckets
+
+    def _admit(self, model: str, tokens: int, job_id: str, waited: float) -> Grant:
+        requests_bucket, tokens_bucket = self._model_buckets(model)
+        requests_bucket.consume(1)
+        tokens_bucket.consume(tokens)
+        self._served[job_id] = self._served.get(job_id, 0) + tokens
+        stats = self._job_stats.setdefault(job_id, {"calls": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0})
+        stats["calls"] += 1
+        stats["queue_wait_total"] += waited
+        stats["queue_wait_max"] = max(stats["queue_wait_max"], waited)
+        return Grant(model, tokens, job_id, waited)
+
+    def _delay(self, model: str, tokens: int) -> float:
+        requests_bucket, tokens_bucket = self._model_buckets(model)
+        return max(requests_bucket.time_until(1), tokens_bucket.time_until(tokens))
+
+    def acquire(self, model: str, tokens: int, task: str = "mapping", timeout: Optional[float] = None) -> Grant:
+        """Blocks until the request may be sent, for the job bound by `llm_job` (if any).
+        Raises TimeoutError if not admitted within `timeout` seconds."""
+        job_id, job_class = _current_job.get()
+        start = time.monotonic()
+        with self._cond:
+            entry = [
+                JOB_CLASSES.get(job_class, len(JOB_CLASSES)),
+                TASK_PRIORITIES.get(task, len(TASK_PRIORITIES)),
+                self._served.get(job_id, 0),
+                next(self._seq),
+                job_id,
+            ]
+            queue = self._waiting.setdefault(model, [])
+            queue.append(entry)
+            try:
+                while True:
+                    # Refresh fair-share position; another call of this job may have been served
+                    for waiting in queue:
+                        waiting[2] = self._served.get(waiting[4], 0)
+                    is_head = min(queue) is entry
+                    delay = self._delay(model, tokens) if is_head else 1.0
+                    if is_head and delay <= 0:
+                        queue.remove(entry)
+                        grant = self._admit(model, tokens, job_id, time.monotonic() - start)
+                        self._cond.notify_all()
+                        return grant
+                    if timeout is not None:
+                        remaining = start + timeout - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"not admitted for {model} within {timeout:.1f}s")
+                        delay = min(delay, remaining)
+                    self._cond.wait(timeout=delay)
+            except BaseException:
+                if entry in queue:
+                    queue.remove(entry)
+                    self._cond.notify_all()
+                raise
+
+    def try_acquire(self, model: str, tokens: int) -> Optional[Grant]:
+        """Admits immediately if nobody is queued for the model and budget is available, else None."""
+        job_id, _ = _current_job.get()
+        with self._cond:
+            if self._waiting.get(model) or self._delay(model, tokens) > 0:
+                return None
+            return self._admit(model, tokens, job_id, 0.0)
+
+    def settle(self, grant: Grant, actual_tokens: int) -> None:
+        """Corrects the token bucket once the provider reports real usage for a granted call."""
+        with self._cond:
+            _, tokens_bucket = self._model_buckets(grant.model)
+            tokens_bucket.consume(actual_tokens - grant.tokens)
+            self._served[grant.job_id] = self._served.get(grant.job_id, 0) + actual_tokens - grant.tokens
+            self._cond.notify_all()
+
+    def job_stats(self, job_id: str) -> Dict[str, float]:
+        with self._cond:
+            return dict(self._job_stats.get(job_id, {"calls": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0}))
+
+    def end_job(self, job_id: str) -> Dict[str, float]:
+        """Drops per-job bookkeeping and returns the job's final queue statistics."""
+        with self._cond:
+            self._served.pop(job_id, None)
+            return self._job_stats.pop(job_id, {"calls": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0})
+
+
+def estimate_tokens(prompt: str, completion_tokens: int = 512) -> int:
+    """Rough prompt size (~4 characters per token) plus an allowance for the completion."""
+    return len(prompt) // 4 + completion_tokens
+
+
+@contextmanager
+def llm_job(job_id: str, job_class: str = "interactive"):
+    """Binds LLM calls made in this context (and its thread) to a job for priority and fair sharing."""
+    token = _current_job.set((job_id, job_class))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+_governor: Optional[LLMGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> LLMGovernor:
+    """Returns the process-wide governor configured from LLM_RPM_LIMIT, LLM_TPM_LIMIT and
+    LLM_LIMITS (JSON mapping model name to [rpm, tpm])."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            limits = {m: tuple(v) for m, v in json.loads(os.getenv("LLM_LIMITS", "{}")).items()}
+            _governor = LLMGovernor(
+                default_rpm=int(os.getenv("LLM_RPM_LIMIT", "30")),
+                default_tpm=int(os.getenv("LLM_TPM_LIMIT", "6000")),
+                limits=limits,
+            )
+        return _governor
@@ -1,11 +1,13 @@
 from dotenv import load_dotenv
 import os
-from document_processor import extract_text_from_pdf
+import uuid
+from document_processor import extract_pages_from_pdf
 from sales_agent import SalesAgent
 from technical_agent import TechnicalAgent
 from pricing_agent import PricingAgent
 from pdf_exporter import create_proposal_pdf
-from langchain_groq import ChatGroq
+from llm_client import get_llm_client
+from llm_governor import get_governor, llm_job
 
 load_dotenv()
 
@@ -14,8 +16,8 @@ load_dotenv()
 class OrchestratorAgent:
     """Coordinates Sales, Technical and Pricing agents, validates outputs, polishes text, and assembles the final proposal."""
 
-    def run_and_export(self, pdf_path: str, output_file: str) -> dict:
-        proposal = self.run(pdf_path)
+    def run_and_export(self, pdf_path: str, output_file: str, job_class: str = "interactive") -> dict:
+        proposal = self.run(pdf_path, job_class=job_class)
         print("[4/4] Orchestrator: creating proposal PDF...")
         create_proposal_pdf(proposal, output_file)
         return proposal
@@ -24,7 +26,16 @@ class OrchestratorAgent:
         self.sales = SalesAgent()
         self.tech = TechnicalAgent()
         self.pricing = PricingAgent()
-        self.polish_llm = ChatGroq(temperature=0, model=model_name)
+        self.polish_llm = get_llm_client(model_name)
+
+    @staticmethod
+    def config_settings(model_name: str = "gpt-4o-mini") -> dict:
+        """Settings that determine the generated proposal (besides COMPANY_* and LLM_* env), for result caching."""
+        pricing = PricingAgent()
+        return {
+            "model_name": model_name,
+            "rate_card": {"rate_per_hour": pricing.rate, "productivity_factor": pricing.productivity},
+        }
 
     def _validate(self, proposal: dict) -> list:
         issues = []
@@ -36,26 +47,44 @@ class OrchestratorAgent:
             issues.append('No pricing estimates available')
         return issues
 
-    def _polish_section(self, title: str, content: str) -> str:
+    def _polish_section(self, title: str, content: str, errors: list = None) -> str:
+        """Returns the polished section, or `content` unchanged if the LLM call fails (the failure is appended to `errors`)."""
         prompt = (
             f"You are a senior proposal writer. Expand and enrich the following section titled '{title}' for clarity, professionalism, and persuasive impact. "
             "Add best practices, methodology, value propositions, and real-world examples relevant to the section. Use 3-5 paragraphs, include industry insights, and make the content visually engaging and comprehensive for a client proposal.\n\n" + content
         )
         try:
-            resp = self.polish_llm(prompt)
+            resp = self.polish_llm(prompt, task="polishing")
             text = resp.generations[0][0].text if hasattr(resp, 'generations') else str(resp)
             return text.strip()
-        except Exception:
+        except Exception as e:
+            if errors is not None:
+                errors.append(f"{title}: {type(e).__name__}: {e}")
             return content
 
-    def run(self, pdf_path: str) -> dict:
-        text = extract_text_from_pdf(pdf_path)
+    def run(self, pdf_path: str, job_class: str = "interactive") -> dict:
+        """Runs the pipeline as one governor job; `job_class` is "interactive" or "batch"."""
+        job_id = f"{os.path.basename(pdf_path)}-{uuid.uuid4().hex[:8]}"
+        with llm_job(job_id, job_class):
+            try:
+                proposal = self._run(pdf_path)
+            finally:
+                queue_stats = get_governor().end_job(job_id)
+        proposal['_llm_queue'] = queue_stats
+        return proposal
+
+    def _run(self, pdf_path: str) -> dict:
+        pages = extract_pages_from_pdf(pdf_path)
+        text = "\n\n".join(pages)
 
         print("[1/4] Sales Agent: extracting and summarizing...")
-        rfp_summary = self.sales.analyze(text)
+        rfp_summary = self.sales.analyze(text, pages=pages)
 
         print("[2/4] Technical Agent: mapping requirements...")
         tech_mapping = self.tech.map_requirements(rfp_summary.get("requirements", []))
+        mapping_stats = self.tech.last_stats
+        print(f"      {mapping_stats.get('requirements', 0)} requirements mapped with {mapping_stats.get('clusters', 0)} LLM calls "
+              f"({mapping_stats.get('llm_calls_saved', 0)} saved by clustering)")
 
         print("[3/4] Pricing Agent: estimating costs...")
         pricing_report = self.pricing.estimate(rfp_summary.get("requirements", []))
@@ -66,8 +95,12 @@ class OrchestratorAgent:
             "requirements": rfp_summary.get("requirements", []),
             "technical_mapping": tech_mapping,
             "pricing": pricing_report,
+            "_mapping_stats": mapping_stats,
         }
 
+        if rfp_summary.get("_error"):
+            proposal['_error'] = rfp_summary["_error"]
+
         issues = self._validate(proposal)
         if issues:
             proposal['_validation_issues'] = issues
@@ -77,11 +110,14 @@ class OrchestratorAgent:
 
         # Polish each section for better readability
         polished_sections = []
+        polish_errors = []
         for sec in sections:
-            polished = self._polish_section(sec['title'], sec['content'])
+            polished = self._polish_section(sec['title'], sec['content'], polish_errors)
             polished_sections.append({'title': sec['title'], 'content': polished})
 
         proposal['sections'] = polished_sections
+        if polish_errors:
+            proposal['_polish_errors'] = polish_errors
 
         return proposal
 
@@ -1,6 +1,7 @@
 
 
 import os
+from typing import Dict, Iterable, List
 from fpdf import FPDF
 from datetime import datetime
 
@@ -28,6 +29,134 @@ class PDF(FPDF):
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
         self.set_text_color(0, 0, 0)
 
+
+class TableRenderer:
+    """Draws a bordered table with wrapped cells, repeating the header row on every page.
+
+    String widths and wrapped cell lines are cached per font, so text that repeats across
+    rows (e.g. pricing notes) is measured once. Rows that do not fit the remaining space
+    move to the next page; rows taller than a whole page are split line by line."""
+
+    MAX_CACHE_ENTRIES = 20000
+
+    def __init__(self, pdf: FPDF, col_widths: List[float], headers: List[str], line_height: float = 8):
+        self.pdf = pdf
+        self.col_widths = col_widths
+        self.headers = headers
+        self.line_height = line_height
+        self._widths: Dict[tuple, float] = {}
+        self._wrapped: Dict[tuple, List[str]] = {}
+
+    def _font_key(self) -> tuple:
+        return (self.pdf.font_family, self.pdf.font_style, self.pdf.font_size_pt)
+
+    def string_width(self, text: str) -> float:
+        key = (self._font_key(), text)
+        width = self._widths.get(key)
+        if width is None:
+            if len(self._widths) >= self.MAX_CACHE_ENTRIES:
+                self._widths.clear()
+            width = self._widths[key] = self.pdf.get_string_width(text)
+        return width
+
+    def wrap(self, text: str, width: float) -> List[str]:
+        """Splits text into lines that fit a cell of the given width (cell padding included)."""
+        key = (self._font_key(), width, text)
+        cached = self._wrapped.get(key)
+        if cached is not None:
+            return cached
+        avail = width - 2 * self.pdf.c_margin
+        space_w = self.string_width(' ')
+        lines = []
+        for paragraph in text.split('\n'):
+            line, line_w = '', 0.0
+            for word in paragraph.split():
+                word_w = self.string_width(word)
+                if word_w > avail:
+                    # Hard-break tokens wider than the cell (long ids, URLs)
+                    if line:
+                        lines.append(line)
+                    line, line_w = '', 0.0
+                    for ch in word:
+                        ch_w = self.string_width(ch)
+                        if line and line_w + ch_w > avail:
+                            lines.append(line)
+                            line, line_w = '', 0.0
+                        line += ch
+                        line_w += ch_w
+                elif line and line_w + space_w + word_w > avail:
+                    lines.append(line)
+                    line, line_w = word, word_w
+                elif line:
+                    line += ' ' + word
+                    line_w += space_w + word_w
+                else:
+                    line, line_w = word, word_w
+            lines.append(line)
+        if len(self._wrapped) >= self.MAX_CACHE_ENTRIES:
+            self._wrapped.clear()
+        self._wrapped[key] = lines
+        return lines
+
+    def _lines_left_on_page(self) -> int:
+        return int((self.pdf.page_break_trigger - self.pdf.get_y()) // self.line_height)
+
+    def _new_page(self) -> None:
+        self.pdf.add_page()
+        self._draw_header()
+
+    def _draw_header(self) -> None:
+        pdf = self.pdf
+        x, y = pdf.l_margin, pdf.get_y()
+        for header, w in zip(self.headers, self.col_widths):
+            pdf.set_xy(x, y)
+            pdf.cell(w, self.line_height, header, border=1, fill=True)
+            x += w
+        pdf.set_xy(pdf.l_margin, y + self.line_height)
+
+    def _draw_fragment(self, cells: List[List[str]], start: int, count: int) -> None:
+        pdf = self.pdf
+        x, y = pdf.l_margin, pdf.get_y()
+        height = count * self.line_height
+        # Same baseline as cell(), but text() skips cell()'s per-call layout work
+        baseline = y + 0.5 * self.line_height + 0.3 * pdf.font_size
+        for lines, w in zip(cells, self.col_widths):
+            pdf.rect(x, y, w, height)
+            for i, line in enumerate(lines[start:start + count]):
+                if line:
+                    pdf.text(x + pdf.c_margin, baseline + i * self.line_height, line)
+            x += w
+        pdf.set_xy(pdf.l_margin, y + height)
+
+    def render(self, rows: Iterable[List[str]]) -> None:
+        pdf = self.pdf
+        auto_break, margin = pdf.auto_page_break, pdf.b_margin
+        # Page breaks are placed by the table itself so a row is never cut by fpdf mid-draw
+        pdf.set_auto_page_break(False, margin)
+        try:
+            if self._lines_left_on_page() < 2:
+                pdf.add_page()
+            self._draw_header()
+            page_capacity = int((pdf.page_break_trigger - pdf.t_margin) // self.line_height) - 1
+            for row in rows:
+                cells = [self.wrap(value, w) for value, w in zip(row, self.col_widths)]
+                n_lines = max(len(lines) for lines in cells)
+                room = self._lines_left_on_page()
+                if room < n_lines <= page_capacity:
+                    self._new_page()
+                start = 0
+                while start < n_lines:
+                    room = self._lines_left_on_page()
+                    if room < 1:
+                        self._new_page()
+                        room = max(1, self._lines_left_on_page())
+                    count = min(room, n_lines - start)
+                    self._draw_fragment(cells, start, count)
+                    start += count
+        finally:
+            pdf.set_auto_page_break(auto_break, margin)
+
+
 def create_proposal_pdf(proposal: dict, filename: str):
     font_path = get_noto_serif_font()
     pdf = PDF()
@@ -114,28 +243,16 @@ def create_proposal_pdf(proposal: dict, filename: str):
                 pdf.set_font("NotoSerif", '', 11)
                 col_widths = [40, 25, 35, 80]
                 pdf.set_fill_color(220, 220, 220)
-                pdf.cell(col_widths[0], 8, "Requirement", border=1, fill=True)
-                pdf.cell(col_widths[1], 8, "Hours", border=1, fill=True)
-                pdf.cell(col_widths[2], 8, "Cost", border=1, fill=True)
-                pdf.cell(col_widths[3], 8, "Notes", border=1, ln=True, fill=True)
-                for item in line_items:
-                    y_before = pdf.get_y()
-                    x_left = pdf.get_x()
-                    req = str(item.get('requirement_id', ''))
-                    hrs = str(item.get('hours', ''))
-                    cost = f"${item.get('cost', 0):,.2f}"
-                    notes = str(item.get('notes', ''))
-                    notes_lines = pdf.multi_cell(col_widths[3], 8, notes, border=0, align='L', split_only=True)
-                    n_lines = len(notes_lines)
-                    row_height = max(8, 8 * n_lines)
-                    pdf.set_xy(x_left, y_before)
-                    pdf.cell(col_widths[0], row_height, req, border=1)
-                    pdf.cell(col_widths[1], row_height, hrs, border=1)
-                    pdf.cell(col_widths[2], row_height, cost, border=1)
-                    x_notes = pdf.get_x()
-                    y_notes = pdf.get_y()
-                    pdf.multi_cell(col_widths[3], 8, notes, border=1, align='L')
-                    pdf.set_xy(x_left, y_before + row_height)
+                table = TableRenderer(pdf, col_widths, ["Requirement", "Hours", "Cost", "Notes"], line_height=8)
+                table.render(
+                    [
+                        str(item.get('requirement_id', '')),
+                        str(item.get('hours', '')),
+                        f"${item.get('cost', 0):,.2f}",
+                        str(item.get('notes', '')),
+                    ]
+                    for item in line_items
+                )
                 pdf.ln(4)
                 pdf.set_font("NotoSerif", 'B', 12)
                 pdf.cell(0, 8, "Pricing Scenarios", ln=True)
@@ -169,103 +286,3 @@ def create_proposal_pdf(proposal: dict, filename: str):
 
     # Footer and save
     pdf.output(filename)
-
-
-
-
-
-
-
-    font_path = get_noto_serif_font()
-    pdf = PDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_font('NotoSerif', '', font_path, uni=True)
-    pdf.add_font('NotoSerif', 'B', font_path, uni=True)
-    pdf.add_font('NotoSerif', 'I', font_path, uni=True)
-
-    # Title page
-    pdf.add_page()
-    pdf.set_font("NotoSerif", 'B', 20)
-    pdf.cell(0, 12, f"Proposal: {proposal.get('client', 'Client')}", ln=True, align='C')
-    pdf.ln(8)
-    pdf.set_font("NotoSerif", '', 12)
-    pdf.cell(0, 8, f"Date: {datetime.utcnow().strftime('%Y-%m-%d')}", ln=True, align='C')
-
-    # Table of Contents (simple list)
-    pdf.add_page()
-    pdf.set_font("NotoSerif", 'B', 14)
-    pdf.cell(0, 8, "Table of Contents", ln=True)
-    pdf.ln(4)
-    pdf.set_font("NotoSerif", '', 12)
-    sections = proposal.get('sections', [])
-    for idx, sec in enumerate(sections, start=1):
-        pdf.cell(0, 6, f"{idx}. {sec.get('title')}", ln=True)
-    pdf.ln(6)
-
-    # Render sections with headings and richer content
-    for sec in sections:
-        pdf.add_page()
-        pdf.set_font("NotoSerif", 'B', 18)
-        pdf.set_text_color(0, 51, 102)
-        pdf.cell(0, 12, sec.get('title'), ln=True)
-        pdf.set_text_color(0, 0, 0)
-        pdf.ln(4)
-        pdf.set_font("NotoSerif", '', 13)
-        content = sec.get('content', '')
-        # If this is the pricing section, render as table
-        if 'pricing' in sec['title'].lower():
-            pricing = proposal.get('pricing', {})
-            line_items = pricing.get('line_items', [])
-            scenarios = pricing.get('scenarios', {})
-            if line_items:
-                pdf.set_font("NotoSerif", 'B', 14)
-                pdf.set_fill_color(220, 235, 255)
-                pdf.cell(0, 10, "Pricing Breakdown", ln=True, fill=True)
-                pdf.set_font("NotoSerif", '', 12)
-                # Table header
-                pdf.set_fill_color(220, 220, 220)
-                pdf.cell(40, 10, "Requirement", border=1, fill=True)
-                pdf.cell(25, 10, "Hours", border=1, fill=True)
-                pdf.cell(35, 10, "Cost", border=1, fill=True)
-                pdf.cell(0, 10, "Notes", border=1, ln=True, fill=True)
-                # Table rows
-                for item in line_items:
-                    pdf.cell(40, 10, str(item.get('requirement_id', '')), border=1)
-                    pdf.cell(25, 10, str(item.get('hours', '')), border=1)
-                    pdf.cell(35, 10, f"${item.get('cost', 0):,.2f}", border=1)
-                    # Wrap notes text in the cell
-                    notes = str(item.get('notes', ''))
-                    x = pdf.get_x()
-                    y = pdf.get_y()
-                    w = pdf.w - pdf.l_margin - pdf.r_margin - 100  # Remaining width for notes
-                    h = pdf.font_size * (notes.count('\n') + 1) + 4
-                    pdf.multi_cell(0, 10, notes, border=1)
-                    pdf.set_xy(x + 100, y)  # Move to next row
-                    pdf.ln(h - 10)
-                pdf.ln(6)
-                # Pricing scenarios
-                pdf.set_font("NotoSerif", 'B', 14)
-                pdf.set_fill_color(220, 235, 255)
-                pdf.cell(0, 10, "Pricing Scenarios", ln=True, fill=True)
-                pdf.set_font("NotoSerif", '', 12)
-                pdf.cell(50, 10, "Scenario", border=1, fill=True)
-                pdf.cell(0, 10, "Total Cost", border=1, ln=True, fill=True)
-                for label, value in scenarios.items():
-                    pdf.cell(50, 10, label.capitalize(), border=1)
-                    pdf.cell(0, 10, f"${value:,.2f}", border=1, ln=True)
-                pdf.ln(6)
-            # Add the rest of the content
-            if content:
-                pdf.multi_cell(0, 8, content)
-        else:
-            # For other sections, only use actual content
-            if content:
-                pdf.multi_cell(0, 8, content)
-            # Add a placeholder for visuals (e.g., chart)
-            if 'solution' in sec['title'].lower():
-                chart_path = os.path.join(os.path.dirname(__file__), 'solution_chart.png')
-                if os.path.exists(chart_path):
-                    pdf.ln(4)
-                    pdf.image(chart_path, x=30, w=150)
-        pdf.ln(4)
-
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_INDEX_FILE = "proposal_cache.json"
+
+# Environment values that change the generated proposal
+_CONFIG_ENV_PREFIXES = ("COMPANY_", "LLM_", "REQ_CLUSTER_")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_fingerprint(settings: Dict) -> str:
+    """Hashes the pipeline settings (model names, rate card, ...) together with every
+    COMPANY_*, LLM_* and REQ_CLUSTER_* environment value."""
+    env = {k: v for k, v in os.environ.items() if k.startswith(_CONFIG_ENV_PREFIXES)}
+    payload = json.dumps({"settings": settings, "env": env}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_degraded(proposal: Dict) -> bool:
+    """True when the proposal was built from fallback output (an LLM call failed), so it must not be cached."""
+    if proposal.get("_error") or proposal.get("_polish_errors"):
+        return True
+    return any(isinstance(m, dict) and m.get("_error") for m in proposal.get("technical_mapping", []))
+
+
+class ProposalCache:
+    """Maps (RFP content hash, configuration fingerprint) to a generated proposal in `output_dir`.
+
+    Entries remember the output's size and mtime, so a proposal that was regenerated or
+    replaced on disk since it was cached is treated as a miss. Keys currently being generated
+    are tracked so a repeat request joins the running job instead of starting another."""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.index_path = os.path.join(output_dir, CACHE_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, str] = {}
+        self._index = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def key(pdf_path: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{file_sha256(pdf_path)}:{fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached output file name, or None if missing or changed on disk."""
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return None
+            path = os.path.join(self.output_dir, entry["output_file"])
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+                return None
+            return entry["output_file"]
+
+    def put(self, key: str, output_file: str) -> None:
+        stat = os.stat(os.path.join(self.output_dir, output_file))
+        with self._lock:
+            self._index[key] = {"output_file": output_file, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            self._save()
+
+    def start(self, key: str, output_file: str) -> Optional[str]:
+        """Marks a key as being generated. Returns the output name of an existing run for the
+        same key (and marks nothing), or None if the caller should run the pipeline."""
+        with self._lock:
+            running = self._in_flight.get(key)
+            if running is not None:
+                return running
+            self._in_flight[key] = output_file
+            return None
+
+    def finish(self, key: str) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
@@ -1,11 +1,12 @@
 import json
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from llm_client import get_llm_client
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
+from hybrid_retriever import update_bm25_index
+from chunker import chunk_pages
 
 load_dotenv()
 
@@ -15,22 +16,27 @@ class SalesAgent:
     and uses an LLM to extract structured RFP information from the RFP text using RAG."""
 
     def __init__(self, persist_directory: str = "chroma_db", model_name: str = "gpt-4o-mini"):
-        self.llm = ChatGroq(temperature=0, model=model_name)
+        self.llm = get_llm_client(model_name)
         self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
         self.persistent_dir = persist_directory
 
-    def _build_vector_store(self, text: str) -> Chroma:
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        docs = splitter.split_text(text)
+    def _build_vector_store(self, text: str, pages: Optional[List[str]] = None) -> Chroma:
+        # Non-overlapping, section-aligned chunks carrying page_start/page_end/section metadata
+        chunks = chunk_pages(pages if pages else [text])
+        docs = [chunk for chunk, _ in chunks]
         if not os.path.exists(self.persistent_dir):
             os.makedirs(self.persistent_dir, exist_ok=True)
-        vectordb = Chroma.from_texts(docs, embedding=self.embeddings, persist_directory=self.persistent_dir)
+        vectordb = Chroma.from_texts(docs, embedding=self.embeddings, metadatas=[meta for _, meta in chunks],
+                                     persist_directory=self.persistent_dir)
+        # Lexical index over the same chunks for exact-token lookups (model numbers, counts)
+        update_bm25_index(self.persistent_dir, docs)
         # vectordb.persist()  # No longer needed as of Chroma 0.4.x
         return vectordb
 
-    def analyze(self, text: str) -> Dict:
-        """Returns a structured summary dict and builds a local Chroma vectorstore for RAG retrieval."""
-        vectordb = self._build_vector_store(text)
+    def analyze(self, text: str, pages: Optional[List[str]] = None) -> Dict:
+        """Returns a structured summary dict and builds a local Chroma vectorstore for RAG retrieval.
+        Pass `pages` (from extract_pages_from_pdf) to keep page boundaries in the chunk metadata."""
+        vectordb = self._build_vector_store(text, pages)
         retriever = vectordb.as_retriever(search_type="similarity", search_kwargs={"k": 4})
 
         # Use LLM with retrieved context to extract structured JSON
@@ -52,7 +58,7 @@ class SalesAgent:
         prompt = system + "\n\n" + user_prompt.format(context=context_str)
 
         try:
-            resp = self.llm(prompt)
+            resp = self.llm(prompt, task="extraction")
             # LLM returns ChatGeneration; get text
             text_response = resp.generations[0][0].text if hasattr(resp, 'generations') else str(resp)
             json_start = text_response.find('{')
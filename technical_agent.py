@@ -1,20 +1,50 @@
+import copy
 import json
-from typing import List, Dict
+import math
+import os
+from typing import List, Dict, Optional
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from llm_client import get_llm_client
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
+from hybrid_retriever import HybridRetriever, load_bm25_index
+from ingest_knowledge_base import KNOWLEDGE_BASE_COLLECTION, MANIFEST_FILE
 
 load_dotenv()
 
 
+def cluster_requirements(vectors: List[List[float]], threshold: float) -> List[List[int]]:
+    """Greedy leader clustering on cosine similarity. Each vector joins the first cluster whose
+    leader is at least `threshold` similar, otherwise it starts a new cluster. Returns lists of
+    indices in input order; the first index of each cluster is its leader."""
+    leaders = []
+    clusters: List[List[int]] = []
+    for idx, vec in enumerate(vectors):
+        norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+        unit = [x / norm for x in vec]
+        for c, leader in enumerate(leaders):
+            if sum(a * b for a, b in zip(unit, leader)) >= threshold:
+                clusters[c].append(idx)
+                break
+        else:
+            leaders.append(unit)
+            clusters.append([idx])
+    return clusters
+
+
 class TechnicalAgent:
-    """Maps requirements to services using RAG for contextual evidence and produces compliance scores."""
+    """Maps requirements to services using RAG for contextual evidence and produces compliance scores.
+    Near-duplicate requirements are clustered by embedding similarity and mapped once per cluster."""
 
-    def __init__(self, catalog: List[str] = None, chroma_dir: str = "chroma_db", model_name: str = "gpt-4o-mini"):
-        self.llm = ChatGroq(temperature=0, model=model_name)
+    def __init__(self, catalog: List[str] = None, chroma_dir: str = "chroma_db", model_name: str = "gpt-4o-mini",
+                 cluster_threshold: Optional[float] = None):
+        self.llm = get_llm_client(model_name)
         self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
         self.persistent_dir = chroma_dir
+        # 1.0 or above disables clustering
+        self.cluster_threshold = cluster_threshold if cluster_threshold is not None else float(
+            os.getenv("REQ_CLUSTER_THRESHOLD", "0.92"))
+        self.last_stats: Dict = {}
         self.catalog = catalog or [
             "Cloud Migration",
             "Managed Services",
@@ -28,35 +58,77 @@ class TechnicalAgent:
         if not self.persistent_dir:
             raise ValueError("Chroma directory not configured")
         vectordb = Chroma(persist_directory=self.persistent_dir, embedding_function=self.embeddings)
-        return vectordb.as_retriever(search_type="similarity", search_kwargs={"k": 5})
+        return HybridRetriever(vectordb, load_bm25_index(self.persistent_dir), k=5)
+
+    def _get_knowledge_base(self):
+        """Past-proposal collection built by ingest_knowledge_base.py, or None if never ingested."""
+        if not self.persistent_dir or not os.path.exists(os.path.join(self.persistent_dir, MANIFEST_FILE)):
+            return None
+        return Chroma(collection_name=KNOWLEDGE_BASE_COLLECTION, persist_directory=self.persistent_dir,
+                      embedding_function=self.embeddings)
+
+    def _cluster(self, requirements: List[Dict], need_vectors: bool = False):
+        """Returns (clusters, vectors). Requirement texts are embedded in one batch when clustering
+        is enabled or `need_vectors` is set; otherwise vectors is None."""
+        clustering = len(requirements) >= 2 and self.cluster_threshold < 1.0
+        singletons = [[i] for i in range(len(requirements))]
+        if not clustering and not need_vectors:
+            return singletons, None
+        vectors = self.embeddings.embed_documents([req.get('text', '') for req in requirements])
+        return (cluster_requirements(vectors, self.cluster_threshold) if clustering else singletons), vectors
+
+    def _map_one(self, retriever, knowledge_base, req: Dict, vector: Optional[List[float]] = None) -> Dict:
+        req_text = req.get('text', '')
+        retrieved = retriever.invoke(req_text)
+        evidence = "\n\n".join(d.page_content for d in retrieved)
+        if knowledge_base is not None:
+            # Reuse the clustering embedding instead of embedding the requirement again
+            past = knowledge_base.similarity_search_by_vector(vector, k=3)
+            if past:
+                evidence += "\n\nFrom past bids:\n" + "\n\n".join(
+                    f"[{d.metadata.get('source', 'past proposal')}] {d.page_content}" for d in past)
+
+        prompt = (
+            "You are a senior solutions architect. Given the requirement and the retrieved contextual evidence, map the requirement to the best matching services in the catalog. "
+            "For each mapping return JSON with keys: requirement_id, services (array), approach (2-3 sentences), compliance_score (0-100), evidence (short excerpt).\n\n"
+            f"Catalog: {', '.join(self.catalog)}\nRequirement: '{req_text[:800]}'\nEvidence:\n{evidence}\n\nJSON:\n"
+        )
+
+        try:
+            resp = self.llm(prompt, task="mapping")
+            text_resp = resp.generations[0][0].text if hasattr(resp, 'generations') else str(resp)
+            jstart = text_resp.find('{')
+            return json.loads(text_resp[jstart:])
+        except Exception as e:
+            return {
+                "requirement_id": req.get('id', ''),
+                "services": [self.catalog[0]],
+                "approach": "We propose a standard approach using the selected service.",
+                "compliance_score": 50,
+                "evidence": evidence[:500],
+                "_error": str(e),
+            }
 
     def map_requirements(self, requirements: List[Dict]) -> List[Dict]:
         retriever = self._get_retriever()
-        mappings = []
-
-        for req in requirements:
-            req_text = req.get('text', '')
-            retrieved = retriever.invoke(req_text)
-            evidence = "\n\n".join(d.page_content for d in retrieved)
-
-            prompt = (
-                "You are a senior solutions architect. Given the requirement and the retrieved contextual evidence, map the requirement to the best matching services in the catalog. "
-                "For each mapping return JSON with keys: requirement_id, services (array), approach (2-3 sentences), compliance_score (0-100), evidence (short excerpt).\n\n"
-                f"Catalog: {', '.join(self.catalog)}\nRequirement: '{req_text[:800]}'\nEvidence:\n{evidence}\n\nJSON:\n"
-            )
-
-            try:
-                resp = self.llm(prompt)
-                text_resp = resp.generations[0][0].text if hasattr(resp, 'generations') else str(resp)
-                jstart = text_resp.find('{')
-                j = json.loads(text_resp[jstart:])
-                mappings.append(j)
-            except Exception:
-                mappings.append({
-                    "requirement_id": req.get('id', ''),
-                    "services": [self.catalog[0]],
-                    "approach": "We propose a standard approach using the selected service.",
-                    "compliance_score": 50,
-                    "evidence": evidence[:500],
-                })
+        knowledge_base = self._get_knowledge_base()
+        clusters, vectors = self._cluster(requirements, need_vectors=knowledge_base is not None)
+        mappings: List[Dict] = [{} for _ in requirements]
+
+        for members in clusters:
+            head = members[0]
+            mapping = self._map_one(retriever, knowledge_base, requirements[head],
+                                    vectors[head] if vectors is not None else None)
+            # Fan the cluster's mapping out to every member under its own id
+            for idx in members:
+                member_mapping = copy.deepcopy(mapping)
+                member_mapping['requirement_id'] = requirements[idx].get('id', '')
+                mappings[idx] = member_mapping
+
+        self.last_stats = {
+            "requirements": len(requirements),
+            "clusters": len(clusters),
+            "llm_calls_saved": len(requirements) - len(clusters),
+            "cluster_threshold": self.cluster_threshold,
+        }
         return mappings
@@ -0,0 +1,44 @@
+import os
+import pytest
+from chunker import chunk_pages, is_heading
+
+PAGES = [
+    "ACME County RFP 2024\nSCOPE OF WORK\n" + "The vendor shall support all county sites. " * 8
+    + "\nPage 1 of 3",
+    "Hardware:\nIncludes 112 PCs, 4 Dell PowerEdge servers and 5 SonicWALL firewalls.\n"
+    + "All devices must be patched monthly. " * 8 + "\nPage 2 of 3",
+    "[Page 3: extracted no text]\nPage 3 of 3",
+]
+
+
+def test_heading_detection():
+    assert is_heading("SCOPE OF WORK")
+    assert is_heading("3.2 Network Services")
+    assert is_heading("Payment Schedule:")
+    assert is_heading("Section 4 - Pricing")
+    assert not is_heading("The vendor shall support all county sites.")
+    assert not is_heading("• Firewall Support, Service and Maintenance")
+    assert not is_heading("service and maintenance agreement:")
+
+
+def test_chunks_follow_sections_without_overlap():
+    chunks = chunk_pages(PAGES, max_chars=1000, min_chars=200)
+    texts = [text for text, _ in chunks]
+    assert [meta["section"] for _, meta in chunks] == ["SCOPE OF WORK", "Hardware"]
+    assert texts[1].startswith("Hardware:")
+    assert chunks[1][1]["page_start"] == chunks[1][1]["page_end"] == 2
+    # no running footer, no placeholder, and no text repeated between chunks
+    assert not any("Page 1 of 3" in t or "extracted no text" in t for t in texts)
+    assert "112 PCs" not in texts[0]
+
+
+def test_long_sections_split_under_limit():
+    pages = ["INTRODUCTION\n" + "A sentence about scope. " * 200]
+    chunks = chunk_pages(pages, max_chars=500)
+    assert len(chunks) > 1
+    assert all(len(text) <= 500 for text, _ in chunks)
+    assert "".join(text.replace("\n", " ") for text, _ in chunks).count("scope") == 200
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
@@ -0,0 +1,93 @@
+import os
+import threading
+import pytest
+from langchain_core.documents import Document
+import hybrid_retriever
+from hybrid_retriever import BM25Index, HybridRetriever, load_bm25_index, update_bm25_index
+
+CHUNKS = [
+    "The Authority operates 112 PCs across 11 locations.",
+    "Perimeter security is provided by 5 SonicWALL TZ-400 firewalls.",
+    "Four Dell PowerEdge R740 servers host the file shares.",
+    "The vendor shall provide helpdesk support during business hours.",
+]
+
+
+class _DenseStore:
+    """Returns every chunk with a fixed relevance score and counts calls."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = 0
+
+    def similarity_search_with_relevance_scores(self, query, k=4):
+        self.calls += 1
+        return [(Document(page_content=text), score) for text, score in self.scores.items()][:k]
+
+
+def test_bm25_ranks_exact_tokens_first():
+    index = BM25Index()
+    index.add_texts(CHUNKS)
+    hits = index.search("PowerEdge R740", k=2)
+    assert hits[0][0] == 2
+    assert index.search("nonexistent-token") == []
+
+
+def test_short_exact_query_skips_dense_search():
+    index = BM25Index()
+    index.add_texts(CHUNKS)
+    dense = _DenseStore({CHUNKS[3]: 0.9})
+    retriever = HybridRetriever(dense, index, k=2)
+    docs = retriever.invoke("SonicWALL firewalls")
+    assert docs[0].page_content == CHUNKS[1]
+    assert dense.calls == 0
+
+
+def test_fusion_combines_lexical_and_dense_hits():
+    index = BM25Index()
+    index.add_texts(CHUNKS)
+    dense = _DenseStore({CHUNKS[3]: 0.9, CHUNKS[0]: 0.1})
+    retriever = HybridRetriever(dense, index, k=2, lexical_max_terms=2)
+    docs = retriever.invoke("Provide onsite support for the 112 PCs at each site")
+    assert dense.calls == 1
+    assert {d.page_content for d in docs} == {CHUNKS[0], CHUNKS[3]}
+
+
+def test_index_round_trips_through_chroma_directory(tmp_path):
+    update_bm25_index(str(tmp_path), CHUNKS[:2])
+    update_bm25_index(str(tmp_path), CHUNKS[2:])
+    index = load_bm25_index(str(tmp_path))
+    assert len(index) == len(CHUNKS)
+    assert index.search("SonicWALL", k=1)[0][0] == 1
+
+
+def test_concurrent_updates_keep_every_chunk(tmp_path):
+    def worker(n):
+        for i in range(40):
+            update_bm25_index(str(tmp_path), [f"job {n} chunk {i}-{j}" for j in range(10)])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(load_bm25_index(str(tmp_path))) == 2400
+    assert os.listdir(tmp_path) == ["bm25_index.jsonl"]
+
+
+def test_update_tokenizes_only_new_chunks(tmp_path, monkeypatch):
+    first = update_bm25_index(str(tmp_path), CHUNKS[:3])
+    tokenized = []
+    real_tokenize = hybrid_retriever.tokenize
+    monkeypatch.setattr(hybrid_retriever, "tokenize", lambda text: tokenized.append(text) or real_tokenize(text))
+
+    second = update_bm25_index(str(tmp_path), CHUNKS[3:])
+    assert tokenized == CHUNKS[3:]
+    # the index handed out earlier is not mutated by the update
+    assert len(first) == 3 and "helpdesk" not in first.postings
+    assert second.search("helpdesk", k=1)[0][0] == 3
+    assert len(BM25Index.load(os.path.join(str(tmp_path), "bm25_index.jsonl"))) == len(CHUNKS)
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
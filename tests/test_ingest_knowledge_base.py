@@ -0,0 +1,132 @@
+import os
+import time
+import pytest
+from fpdf import FPDF
+from ingest_knowledge_base import KnowledgeBaseIngestor
+
+
+class _Store:
+    """Records add/delete calls the way the Chroma collection would apply them."""
+
+    def __init__(self):
+        self.docs = {}
+        self.metadatas = {}
+        self.add_calls = 0
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected IDs to be unique")
+        self.add_calls += 1
+        self.docs.update(zip(ids, texts))
+        self.metadatas.update(zip(ids, metadatas))
+
+    def delete(self, ids=None):
+        for i in ids:
+            self.docs.pop(i, None)
+
+
+def _split(pages):
+    return [(p, {"page_start": n, "page_end": n}) for n, page in enumerate(pages, start=1) for p in page.split("\n\n")]
+
+
+def _ingestor(tmp_path, store, workers=1):
+    return KnowledgeBaseIngestor(str(tmp_path / "db"), vectordb=store, split_pages=_split, workers=workers, batch_size=4)
+
+
+def test_only_new_or_changed_files_are_reprocessed(tmp_path):
+    corpus = tmp_path / "bids"
+    corpus.mkdir()
+    for i in range(5):
+        (corpus / f"bid{i}.txt").write_text(f"Bid {i} scope\n\nBid {i} pricing")
+    store = _Store()
+
+    stats = _ingestor(tmp_path, store, workers=2).ingest(str(corpus))
+    assert stats["files_indexed"] == 5 and stats["chunks_added"] == 10
+    assert store.add_calls == 3  # 10 chunks in batches of 4
+    assert stats["files_per_second"] > 0
+
+    stats = _ingestor(tmp_path, store).ingest(str(corpus))
+    assert stats["files_indexed"] == 0 and stats["files_unchanged"] == 5
+
+    time.sleep(0.01)
+    (corpus / "bid1.txt").write_text("Bid 1 revised scope")
+    os.utime(corpus / "bid2.txt")
+    (corpus / "bid4.txt").unlink()
+    stats = _ingestor(tmp_path, store).ingest(str(corpus))
+    assert stats["files_indexed"] == 1
+    assert stats["files_unchanged"] == 3
+    assert stats["files_removed"] == 1
+    assert sorted(store.docs.values()) == sorted(
+        ["Bid 0 scope", "Bid 0 pricing", "Bid 1 revised scope", "Bid 2 scope", "Bid 2 pricing",
+         "Bid 3 scope", "Bid 3 pricing"])
+
+
+def test_identical_files_at_different_paths_keep_their_chunks(tmp_path):
+    corpus = tmp_path / "bids"
+    for sub in ("a", "b"):
+        (corpus / sub).mkdir(parents=True)
+        (corpus / sub / "terms.txt").write_text("Standard terms\n\nPayment net 30")
+    store = _Store()
+
+    stats = _ingestor(tmp_path, store).ingest(str(corpus))
+    assert stats["files_indexed"] == 2 and len(store.docs) == 4
+
+    (corpus / "b" / "terms.txt").unlink()
+    stats = _ingestor(tmp_path, store).ingest(str(corpus))
+    assert stats["files_removed"] == 1
+    assert sorted(store.docs.values()) == ["Payment net 30", "Standard terms"]
+
+
+def test_separate_roots_share_one_store(tmp_path):
+    for root, text in (("dirA", "A scope"), ("dirB", "B scope")):
+        (tmp_path / root).mkdir()
+        (tmp_path / root / "bid.txt").write_text(text)
+    store = _Store()
+
+    _ingestor(tmp_path, store).ingest(str(tmp_path / "dirA"))
+    stats = _ingestor(tmp_path, store).ingest(str(tmp_path / "dirB"))
+    assert stats["files_indexed"] == 1 and stats["files_removed"] == 0
+    assert sorted(store.docs.values()) == ["A scope", "B scope"]
+
+    (tmp_path / "dirA" / "bid.txt").unlink()
+    stats = _ingestor(tmp_path, store).ingest(str(tmp_path / "dirA"))
+    assert stats["files_removed"] == 1
+    assert list(store.docs.values()) == ["B scope"]
+
+
+def test_pdf_pages_keep_layout_metadata(tmp_path):
+    corpus = tmp_path / "bids"
+    corpus.mkdir()
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=11)
+    for n, title in enumerate(["SCOPE OF WORK", "PRICING", "TERMS"], start=1):
+        pdf.add_page()
+        pdf.multi_cell(0, 6, f"{title}\n" + f"The {title.lower()} of this bid is described here. " * 6, new_x="LMARGIN", new_y="NEXT")
+        pdf.multi_cell(0, 6, f"Vortex Solutions Confidential - Page {n}")
+    pdf.output(str(corpus / "bid.pdf"))
+    store = _Store()
+
+    KnowledgeBaseIngestor(str(tmp_path / "db"), vectordb=store, workers=1).ingest(str(corpus))
+    assert not any("Confidential" in text for text in store.docs.values())
+    metas = sorted(store.metadatas.values(), key=lambda m: m["chunk"])
+    assert [m["section"] for m in metas] == ["SCOPE OF WORK", "PRICING", "TERMS"]
+    assert [(m["page_start"], m["page_end"]) for m in metas] == [(1, 1), (2, 2), (3, 3)]
+    assert all(m["source"] == "bid.pdf" for m in metas)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unreadable_file_is_skipped(tmp_path, workers, capsys):
+    corpus = tmp_path / "bids"
+    corpus.mkdir()
+    (corpus / "broken.pdf").write_bytes(b"not a pdf")
+    (corpus / "bid.txt").write_text("Bid scope\n\nBid pricing")
+    store = _Store()
+
+    stats = _ingestor(tmp_path, store, workers=workers).ingest(str(corpus))
+    assert stats["files_failed"] == 1 and stats["files_indexed"] == 1
+    assert sorted(store.docs.values()) == ["Bid pricing", "Bid scope"]
+    assert "broken.pdf" in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
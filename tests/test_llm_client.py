@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from langchain_groq import ChatGroq
+from llm_client import CircuitBreaker, LLMUnavailableError, ResilientLLM
+
+
+class StubGroqServer:
+    """Local OpenAI-compatible endpoint. Each model has a queue of scripted behaviours
+    ("ok", "error", or a float delay in seconds); an empty queue answers "ok"."""
+
+    def __init__(self):
+        self.scripts = {}
+        self.requests = []
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                model = body['model']
+                with lock:
+                    server.requests.append(model)
+                    queue = server.scripts.get(model, [])
+                    action = queue.pop(0) if queue else "ok"
+                if action == "error":
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                if isinstance(action, float):
+                    time.sleep(action)
+                payload = json.dumps({
+                    "id": "stub", "object": "chat.completion", "created": 0, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": f"answer from {model}"},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def model(self, name, timeout=5.0):
+        return name, ChatGroq(model=name, api_key="test", base_url=self.url, max_retries=0, timeout=timeout)
+
+
+@pytest.fixture
+def stub():
+    server = StubGroqServer()
+    yield server
+    server.httpd.shutdown()
+
+
+def test_retries_transient_errors(stub):
+    stub.scripts['primary'] = ["error", "error"]
+    client = ResilientLLM([stub.model('primary')], max_retries=2, backoff_base=0.01)
+    assert client("hi") == "answer from primary"
+    assert client.stats['retries'] == 2
+
+
+def test_deadline_then_fallback_model(stub):
+    stub.scripts['primary'] = [2.0]
+    client = ResilientLLM([stub.model('primary'), stub.model('secondary')], timeout=0.3, max_retries=0)
+    start = time.monotonic()
+    assert client("hi") == "answer from secondary"
+    assert time.monotonic() - start < 1.5
+    assert client.stats['fallbacks'] == 1
+
+
+def test_hedges_slow_request(stub):
+    client = ResilientLLM([stub.model('primary')], timeout=5.0, max_retries=0)
+    for _ in range(20):
+        client("warm up")
+    stub.scripts['primary'] = [2.0]
+    start = time.monotonic()
+    assert client("hi") == "answer from primary"
+    assert time.monotonic() - start < 1.5
+    assert client.stats['hedges'] == 1
+
+
+def test_open_circuit_skips_failing_model(stub):
+    stub.scripts['primary'] = ["error"] * 10
+    client = ResilientLLM([stub.model('primary'), stub.model('secondary')], max_retries=0,
+                          breaker_threshold=2, breaker_reset=60)
+    for _ in range(3):
+        assert client("hi") == "answer from secondary"
+    assert stub.requests.count('primary') == 2
+    assert client.breakers['primary'].state == "open"
+
+
+def test_raises_when_every_model_fails(stub):
+    stub.scripts['primary'] = ["error"] * 3
+    client = ResilientLLM([stub.model('primary')], max_retries=1, backoff_base=0.01)
+    with pytest.raises(LLMUnavailableError):
+        client("hi")
+
+
+def test_call_deadline_bounds_retries_and_fallback(stub):
+    stub.scripts['primary'] = [2.0] * 3
+    stub.scripts['secondary'] = [2.0] * 3
+    client = ResilientLLM([stub.model('primary'), stub.model('secondary')], timeout=0.4, max_retries=2,
+                          backoff_base=0.2, call_deadline=1.0)
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailableError, match="call deadline"):
+        client("hi")
+    # unbounded, this would take 6 attempts x 0.4s plus backoff
+    assert time.monotonic() - start < 1.3
+
+
+def test_breaker_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
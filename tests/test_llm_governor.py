@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+import pytest
+from langchain_core.messages import AIMessage
+from llm_client import ResilientLLM
+from llm_governor import LLMGovernor, TokenBucket, llm_job
+
+
+class _EchoModel:
+    def invoke(self, prompt):
+        return AIMessage(content="ok", usage_metadata={"input_tokens": 5, "output_tokens": 5, "total_tokens": 10})
+
+
+def _admit_in_background(governor, calls, order):
+    """Starts one thread per (job_id, job_class, task) and records the admission order."""
+    threads = []
+    for job_id, job_class, task in calls:
+        def run(job_id=job_id, job_class=job_class, task=task):
+            with llm_job(job_id, job_class):
+                governor.acquire("m", 100, task=task)
+            order.append(job_id)
+        t = threading.Thread(target=run)
+        t.start()
+        threads.append(t)
+        time.sleep(0.05)
+    return threads
+
+
+def test_token_bucket_reports_wait_until_refilled():
+    bucket = TokenBucket(capacity=100, rate=100)
+    bucket.consume(100)
+    assert 0.4 < bucket.time_until(50) <= 0.5
+
+
+def test_queue_wait_reflects_token_budget():
+    governor = LLMGovernor(default_rpm=600, default_tpm=6000)
+    assert governor.acquire("m", 6000).wait_seconds < 0.05
+    grant = governor.acquire("m", 50)
+    assert 0.3 < grant.wait_seconds < 1.0
+
+
+def test_acquire_times_out_and_leaves_queue():
+    governor = LLMGovernor(default_rpm=600, default_tpm=6000)
+    governor.acquire("m", 6000)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        governor.acquire("m", 3000, timeout=0.1)
+    assert time.monotonic() - start < 0.3
+    assert governor._waiting["m"] == []
+
+
+def test_interactive_extraction_served_before_batch_polishing():
+    governor = LLMGovernor(default_rpm=600, default_tpm=6000)
+    governor.acquire("m", 6000)
+    order = []
+    threads = _admit_in_background(governor, [
+        ("batch-polish", "batch", "polishing"),
+        ("batch-extract", "batch", "extraction"),
+        ("live-polish", "interactive", "polishing"),
+        ("live-extract", "interactive", "extraction"),
+    ], order)
+    for t in threads:
+        t.join(timeout=10)
+    assert order == ["live-extract", "live-polish", "batch-extract", "batch-polish"]
+
+
+def test_jobs_of_same_class_share_fairly():
+    governor = LLMGovernor(default_rpm=600, default_tpm=6000)
+    with llm_job("heavy"):
+        governor.acquire("m", 3000)
+    governor.acquire("m", 3000)
+    order = []
+    threads = _admit_in_background(governor, [("heavy", "interactive", "mapping"),
+                                              ("light", "interactive", "mapping")], order)
+    for t in threads:
+        t.join(timeout=10)
+    assert order == ["light", "heavy"]
+    assert governor.end_job("heavy")["calls"] == 2
+
+
+def test_client_exposes_queue_wait_and_settles_usage():
+    governor = LLMGovernor(default_rpm=600, default_tpm=6000)
+    client = ResilientLLM([("m", _EchoModel())], governor=governor)
+    with llm_job("job-1"):
+        resp = client("short prompt", task="extraction")
+    assert resp == "ok"
+    assert resp.queue_wait >= 0.0 and resp.model == "m"
+    stats = governor.job_stats("job-1")
+    assert stats["calls"] == 1
+    assert governor._served["job-1"] == 10
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
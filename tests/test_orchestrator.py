@@ -20,5 +20,17 @@ def test_build_sections_minimal():
     assert 'V. Timeline and Pricing' in titles
 
 
+def test_failed_polish_keeps_content_and_records_error():
+    orch = OrchestratorAgent.__new__(OrchestratorAgent)
+
+    def polish_llm(prompt, task=None):
+        raise TimeoutError("no answer")
+
+    orch.polish_llm = polish_llm
+    errors = []
+    assert orch._polish_section("I. Executive Summary", "Raw text.", errors) == "Raw text."
+    assert errors == ["I. Executive Summary: TimeoutError: no answer"]
+
+
 if __name__ == '__main__':
     pytest.main([os.path.dirname(__file__)])
@@ -0,0 +1,45 @@
+import os
+import pytest
+from pypdf import PdfReader
+from pdf_exporter import PDF, TableRenderer, create_proposal_pdf, get_noto_serif_font
+
+
+def _pdf():
+    pdf = PDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    for style in ('', 'B', 'I'):
+        pdf.add_font('NotoSerif', style, get_noto_serif_font())
+    pdf.add_page()
+    pdf.set_font('NotoSerif', '', 11)
+    return pdf
+
+
+def test_wrap_fits_cell_width_and_caches():
+    pdf = _pdf()
+    table = TableRenderer(pdf, [40, 80], ["Requirement", "Notes"])
+    text = "Heuristic estimate; replace with historical ML model if available. " * 3
+    lines = table.wrap(text, 80)
+    assert len(lines) > 1
+    assert all(pdf.get_string_width(line) <= 80 - 2 * pdf.c_margin for line in lines)
+    assert table.wrap(text, 80) is lines
+    assert table.wrap("x" * 200, 40)[0] and len(table.wrap("x" * 200, 40)) > 1
+
+
+def test_tall_rows_split_across_pages_with_repeated_header(tmp_path):
+    line_items = [{"requirement_id": f"REQ-{i}", "hours": 8, "cost": 960.0, "notes": "short"} for i in range(80)]
+    line_items[3]['notes'] = "word " * 1500
+    proposal = {
+        "sections": [{"title": "V. Timeline and Pricing", "content": "Pricing."}],
+        "pricing": {"line_items": line_items, "scenarios": {"baseline": 76800.0}},
+    }
+    out = str(tmp_path / "proposal.pdf")
+    create_proposal_pdf(proposal, out)
+    pages = [p.extract_text() for p in PdfReader(out).pages]
+    table_pages = [text for text in pages if "REQ-" in text or "word word" in text]
+    assert len(table_pages) >= 3
+    assert all(text.startswith("Requirement") for text in table_pages[1:])
+    assert "REQ-79" in table_pages[-1]
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
@@ -0,0 +1,120 @@
+import importlib.util
+import os
+import pytest
+from fastapi.testclient import TestClient
+from proposal_cache import ProposalCache, config_fingerprint, is_degraded
+
+BACKEND_MAIN = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend', 'main.py')
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("backend_main", BACKEND_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, 'OUTPUT_DIR', str(tmp_path))
+    (tmp_path / 'proposal_x.pdf').write_bytes(bytes(range(256)) * 40)
+    return TestClient(module.app)
+
+
+def test_cache_hit_requires_same_input_and_config(tmp_path, monkeypatch):
+    rfp = tmp_path / 'rfp.pdf'
+    rfp.write_bytes(b'%PDF-1.4 rfp body')
+    (tmp_path / 'proposal_rfp.pdf').write_bytes(b'%PDF-1.4 proposal')
+    cache = ProposalCache(str(tmp_path))
+
+    monkeypatch.setenv('COMPANY_NAME', 'Vortex Solutions')
+    key = cache.key(str(rfp), config_fingerprint({"model_name": "m", "rate_card": {"rate_per_hour": 120.0}}))
+    assert cache.get(key) is None
+    cache.put(key, 'proposal_rfp.pdf')
+    assert ProposalCache(str(tmp_path)).get(key) == 'proposal_rfp.pdf'
+
+    monkeypatch.setenv('COMPANY_NAME', 'Other Co')
+    assert cache.key(str(rfp), config_fingerprint({"model_name": "m", "rate_card": {"rate_per_hour": 120.0}})) != key
+    assert config_fingerprint({"rate_card": {"rate_per_hour": 130.0}}) != config_fingerprint({"rate_card": {"rate_per_hour": 120.0}})
+
+
+def test_replaced_output_is_a_miss(tmp_path):
+    (tmp_path / 'proposal_rfp.pdf').write_bytes(b'first')
+    cache = ProposalCache(str(tmp_path))
+    cache.put('k', 'proposal_rfp.pdf')
+    (tmp_path / 'proposal_rfp.pdf').write_bytes(b'second, longer body')
+    assert cache.get('k') is None
+
+
+def test_in_flight_generation_is_joined(tmp_path):
+    cache = ProposalCache(str(tmp_path))
+    assert cache.start('k', 'proposal_a.pdf') is None
+    assert cache.start('k', 'proposal_b.pdf') == 'proposal_a.pdf'
+    cache.finish('k')
+    assert cache.start('k', 'proposal_b.pdf') is None
+
+
+def test_degraded_proposal_is_not_cached(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("backend_main", BACKEND_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    results = [{"technical_mapping": [{"requirement_id": "R1"}, {"requirement_id": "R2", "_error": "timeout"}]},
+               {"technical_mapping": [{"requirement_id": "R1"}],
+                "_polish_errors": ["Executive Summary: LLMUnavailableError: rate limited"]},
+               {"technical_mapping": [{"requirement_id": "R1"}, {"requirement_id": "R2"}]}]
+
+    class FakeOrchestrator:
+        runs = 0
+
+        @staticmethod
+        def config_settings():
+            return {"model_name": "m"}
+
+        def run_and_export(self, pdf_path, output_file, job_class="interactive"):
+            with open(output_file, "wb") as f:
+                f.write(b"%PDF-1.4 proposal")
+            FakeOrchestrator.runs += 1
+            return results[FakeOrchestrator.runs - 1]
+
+    (tmp_path / 'rfp.pdf').write_bytes(b'%PDF-1.4 rfp body')
+    monkeypatch.setattr(module, 'OrchestratorAgent', FakeOrchestrator)
+    monkeypatch.setattr(module, 'UPLOAD_DIR', str(tmp_path))
+    monkeypatch.setattr(module, 'OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(module, 'cache', ProposalCache(str(tmp_path)))
+    client = TestClient(module.app)
+
+    for _ in range(3):
+        assert client.post('/generate', params={'filename': 'rfp.pdf'}).json()["cached"] is False
+    assert client.post('/generate', params={'filename': 'rfp.pdf'}).json()["cached"] is True
+    assert FakeOrchestrator.runs == 3
+    assert is_degraded({"_error": "rate limited", "technical_mapping": []})
+    assert not is_degraded({"technical_mapping": []})
+
+
+def test_download_etag_and_if_none_match(backend):
+    first = backend.get('/download/proposal_x.pdf')
+    assert first.status_code == 200
+    etag = first.headers['etag']
+    assert first.headers['accept-ranges'] == 'bytes'
+    again = backend.get('/download/proposal_x.pdf', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.content == b''
+
+
+def test_download_byte_ranges(backend):
+    body = bytes(range(256)) * 40
+    part = backend.get('/download/proposal_x.pdf', headers={'Range': 'bytes=10-19'})
+    assert part.status_code == 206
+    assert part.content == body[10:20]
+    assert part.headers['content-range'] == f'bytes 10-19/{len(body)}'
+    assert backend.get('/download/proposal_x.pdf', headers={'Range': 'bytes=-5'}).content == body[-5:]
+    assert backend.get('/download/proposal_x.pdf', headers={'Range': f'bytes={len(body)}-'}).status_code == 416
+    stale = backend.get('/download/proposal_x.pdf', headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert stale.status_code == 200 and stale.content == body
+    etag = stale.headers['etag']
+    fresh = backend.get('/download/proposal_x.pdf', headers={'Range': 'bytes=0-9', 'If-Range': etag})
+    assert fresh.status_code == 206 and fresh.content == body[:10]
+    multi = backend.get('/download/proposal_x.pdf', headers={'Range': 'bytes=0-9,100-109'})
+    assert multi.status_code == 206
+    assert multi.headers['content-type'].startswith('multipart/byteranges')
+    assert body[:10] in multi.content and body[100:110] in multi.content
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])
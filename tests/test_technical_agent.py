@@ -0,0 +1,106 @@
+import os
+import pytest
+from langchain_core.documents import Document
+from technical_agent import TechnicalAgent, cluster_requirements
+
+
+def test_near_duplicates_share_a_cluster():
+    vectors = [
+        [1.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.99, 0.05, 0.0],
+        [0.0, 0.0, 1.0],
+        [0.02, 0.98, 0.01],
+    ]
+    assert cluster_requirements(vectors, 0.95) == [[0, 2], [1, 4], [3]]
+
+
+def test_threshold_of_one_keeps_distinct_vectors_apart():
+    vectors = [[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]
+    assert cluster_requirements(vectors, 1.0 + 1e-9) == [[0], [1], [2]]
+    assert cluster_requirements([], 0.9) == []
+
+
+class _Embeddings:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[t] for t in texts]
+
+
+class _Retriever:
+    def invoke(self, query):
+        return [Document(page_content=f"evidence for {query}")]
+
+
+class _KnowledgeBase:
+    def __init__(self):
+        self.vectors = []
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        self.vectors.append(embedding)
+        return [Document(page_content="Past bid text", metadata={"source": "bid.pdf"})]
+
+
+def test_map_requirements_calls_llm_once_per_cluster(monkeypatch):
+    agent = TechnicalAgent.__new__(TechnicalAgent)
+    prompts = []
+
+    def llm(prompt, task=None):
+        prompts.append(prompt)
+        return '{"requirement_id": "X", "services": ["Managed Services"], "approach": "a", "compliance_score": 90, "evidence": "e"}'
+
+    agent.llm = llm
+    agent.embeddings = _Embeddings({"Patch all PCs": [1.0, 0.0], "Patch every PC": [0.99, 0.05], "Host servers": [0.0, 1.0]})
+    agent.persistent_dir = "unused"
+    agent.cluster_threshold = 0.95
+    agent.catalog = ["Managed Services"]
+    agent.last_stats = {}
+    monkeypatch.setattr(agent, "_get_retriever", lambda: _Retriever())
+    monkeypatch.setattr(agent, "_get_knowledge_base", lambda: None)
+
+    requirements = [{"id": "R1", "text": "Patch all PCs"}, {"id": "R2", "text": "Host servers"},
+                    {"id": "R3", "text": "Patch every PC"}]
+    mappings = agent.map_requirements(requirements)
+
+    assert len(prompts) == 2
+    assert [m["requirement_id"] for m in mappings] == ["R1", "R2", "R3"]
+    assert agent.last_stats == {"requirements": 3, "clusters": 2, "llm_calls_saved": 1, "cluster_threshold": 0.95}
+    # members of a cluster get independent copies
+    mappings[0]["services"].append("Cloud Migration")
+    assert mappings[2]["services"] == ["Managed Services"]
+    assert mappings[0] is not mappings[2]
+
+
+def test_past_bids_are_searched_with_the_clustering_vectors(monkeypatch):
+    agent = TechnicalAgent.__new__(TechnicalAgent)
+    prompts = []
+    agent.llm = lambda prompt, task=None: prompts.append(prompt) or '{"services": []}'
+    embeddings = _Embeddings({"Patch all PCs": [1.0, 0.0], "Host servers": [0.0, 1.0]})
+    embed_calls = []
+    real_embed = embeddings.embed_documents
+    embeddings.embed_documents = lambda texts: embed_calls.append(texts) or real_embed(texts)
+    agent.embeddings = embeddings
+    agent.persistent_dir = "unused"
+    agent.cluster_threshold = 0.95
+    agent.catalog = ["Managed Services"]
+    agent.last_stats = {}
+    knowledge_base = _KnowledgeBase()
+    monkeypatch.setattr(agent, "_get_retriever", lambda: _Retriever())
+    monkeypatch.setattr(agent, "_get_knowledge_base", lambda: knowledge_base)
+
+    agent.map_requirements([{"id": "R1", "text": "Patch all PCs"}, {"id": "R2", "text": "Host servers"}])
+    assert embed_calls == [["Patch all PCs", "Host servers"]]
+    assert knowledge_base.vectors == [[1.0, 0.0], [0.0, 1.0]]
+    assert all("[bid.pdf] Past bid text" in p for p in prompts)
+
+    # with clustering disabled the texts are still embedded once, in a single batch
+    agent.cluster_threshold = 1.0
+    embed_calls.clear()
+    agent.map_requirements([{"id": "R1", "text": "Patch all PCs"}, {"id": "R2", "text": "Host servers"}])
+    assert len(embed_calls) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([os.path.dirname(__file__)])